@@ -1,6 +1,7 @@
 """Bot core setup and initialization."""
 
 import logging
+import time
 
 from telegram import Update
 from telegram.ext import Application, ApplicationBuilder, ContextTypes
@@ -9,12 +10,50 @@ from ..config import get_config
 
 logger = logging.getLogger(__name__)
 
+# Optional: queue outgoing Bot API calls within Telegram's flood limits
+# (python-telegram-bot[rate-limiter], which pulls in aiolimiter)
+try:
+    import aiolimiter  # noqa: F401
+    from telegram.ext import AIORateLimiter
+except ImportError:
+    AIORateLimiter = None
+
+# Per-chat debounce for error replies so error bursts don't flood the Bot API
+ERROR_REPLY_INTERVAL = 5.0  # seconds
+_ERROR_REPLY_MAX_CHATS = 1024
+_last_error_reply: dict[int, float] = {}
+
+
+def _should_reply_to_error(chat_id: int) -> bool:
+    """Check and record whether a chat may receive another error reply.
+
+    Args:
+        chat_id: Telegram chat ID
+
+    Returns:
+        True if no error reply was sent to this chat within the interval
+    """
+    now = time.monotonic()
+    last = _last_error_reply.pop(chat_id, None)
+    if last is not None and now - last < ERROR_REPLY_INTERVAL:
+        _last_error_reply[chat_id] = last
+        return False
+
+    _last_error_reply[chat_id] = now
+    if len(_last_error_reply) > _ERROR_REPLY_MAX_CHATS:
+        # Dicts keep insertion order; the first key is the stalest chat
+        del _last_error_reply[next(iter(_last_error_reply))]
+    return True
+
 
 async def error_handler(update: Update | None, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Log errors without exposing details to users."""
     logger.error("Exception while handling an update:", exc_info=context.error)
 
     if update and update.effective_message:
+        chat = update.effective_chat
+        if chat is not None and not _should_reply_to_error(chat.id):
+            return
         try:
             await update.effective_message.reply_text(
                 "An error occurred. Please try again later."
@@ -27,7 +66,12 @@ def create_bot() -> Application:
     """Create and configure the Telegram bot application."""
     config = get_config()
 
-    app = ApplicationBuilder().token(config.telegram_token).build()
+    builder = ApplicationBuilder().token(config.telegram_token)
+    if AIORateLimiter is not None:
+        builder = builder.rate_limiter(AIORateLimiter(max_retries=3))
+    else:
+        logger.info("aiolimiter not installed; Bot API calls are not rate limited")
+    app = builder.build()
     app.add_error_handler(error_handler)
 
     return app
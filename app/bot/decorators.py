@@ -1,4 +1,6 @@
+import inspect
 import logging
+from collections.abc import Callable
 from functools import wraps
 
 from telegram import Update
@@ -9,6 +11,87 @@ from ..config import get_config
 logger = logging.getLogger(__name__)
 
 
+# Admin membership check, resolved from config on first use. A module global
+# rather than an lru_cache so the hot path is one global load, not a call.
+_admin_check: Callable[[int], bool] | None = None
+
+
+def _load_admin_check() -> Callable[[int], bool]:
+    """Resolve and remember the admin membership check from config."""
+    global _admin_check
+    _admin_check = get_config().admin_contains
+    return _admin_check
+
+
+def _reset_decorator_cache() -> None:
+    """Forget the cached admin check (used by tests and config reloads)."""
+    global _admin_check
+    _admin_check = None
+
+
+def _takes_update_and_context(func) -> bool:
+    """Check whether func accepts exactly (update, context) positionally."""
+    try:
+        params = tuple(inspect.signature(func).parameters.values())
+    except (TypeError, ValueError):
+        return False
+    return len(params) == 2 and all(
+        p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD) for p in params
+    )
+
+
+def _gate(func, needs_query: bool):
+    """Wrap a handler so only admin users reach it.
+
+    Shared by restricted and restricted_callback so both go through one
+    wrapper implementation. Plain (update, context) handlers get a wrapper
+    without *args/**kwargs forwarding.
+
+    Args:
+        func: Async handler to protect
+        needs_query: Require a callback query and answer it on rejection
+    """
+    if needs_query:
+        kind, missing = "callback", "Rejected callback with no user or query"
+    else:
+        kind, missing = "access", "Rejected update with no effective_user"
+
+    async def reject(update: Update) -> None:
+        """Log a rejected update, answering its callback query if any."""
+        user = update.effective_user
+        query = update.callback_query if needs_query else None
+        if user is None or (needs_query and query is None):
+            logger.warning(missing)
+            return
+        logger.warning("Unauthorized %s denied for user %s", kind, user.id)
+        if query is not None:
+            await query.answer()
+
+    # The admin check is inlined in each wrapper so an allowed update costs
+    # no extra coroutine; only rejections go through reject()
+    if _takes_update_and_context(func):
+        @wraps(func)
+        async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            is_admin = _admin_check or _load_admin_check()
+            user = update.effective_user
+            if (user is not None and is_admin(user.id)
+                    and (not needs_query or update.callback_query is not None)):
+                return await func(update, context)
+            await reject(update)
+            return None
+    else:
+        @wraps(func)
+        async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
+            is_admin = _admin_check or _load_admin_check()
+            user = update.effective_user
+            if (user is not None and is_admin(user.id)
+                    and (not needs_query or update.callback_query is not None)):
+                return await func(update, context, *args, **kwargs)
+            await reject(update)
+            return None
+    return wrapped
+
+
 def restricted(func):
     """Decorator to restrict command access to admin users only.
 
@@ -17,38 +100,9 @@ def restricted(func):
     - No user is associated with the update (channel posts, etc.)
     - User ID is not in the admin list
     """
-    @wraps(func)
-    async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
-        user = update.effective_user
-        if user is None:
-            logger.warning("Rejected update with no effective_user")
-            return None
-
-        config = get_config()
-        if user.id not in config.admin_ids:
-            logger.warning(f"Unauthorized access denied for user {user.id}")
-            return None
-
-        return await func(update, context, *args, **kwargs)
-    return wrapped
+    return _gate(func, needs_query=False)
 
 
 def restricted_callback(func):
     """Decorator to restrict callback queries to admin users only."""
-    @wraps(func)
-    async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
-        user = update.effective_user
-        query = update.callback_query
-
-        if user is None or query is None:
-            logger.warning("Rejected callback with no user or query")
-            return None
-
-        config = get_config()
-        if user.id not in config.admin_ids:
-            logger.warning(f"Unauthorized callback denied for user {user.id}")
-            await query.answer()
-            return None
-
-        return await func(update, context, *args, **kwargs)
-    return wrapped
+    return _gate(func, needs_query=True)
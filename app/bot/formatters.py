@@ -1,44 +1,57 @@
 """Formatting utilities for human-readable output."""
 
+import re
+from bisect import bisect_right
 
-def format_uptime(seconds: str) -> str:
+# Matches RouterOS pre-formatted durations such as "1w2d3h4m5s"
+_HAS_ALPHA = re.compile(r'[A-Za-z]').search
+
+# Byte units and the lower bound (in bytes) at which each one starts
+_BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+_BYTE_DIVISORS = tuple(1 << (10 * i) for i in range(len(_BYTE_UNITS)))
+
+# Telegram's per-message character limit and the marker for cut-off text
+_TELEGRAM_MAX_LENGTH = 4096
+_ELLIPSIS = "..."
+
+
+# _int and _divmod pre-bind builtins as locals on this per-message hot
+# path; callers never pass them
+def format_uptime(seconds: str, *, _int=int, _divmod=divmod) -> str:
     """Format uptime from seconds to human readable (e.g., '2d 5h 30m')."""
     try:
         # RouterOS returns uptime like "1w2d3h4m5s" or just seconds
-        if any(c.isalpha() for c in seconds):
+        if _HAS_ALPHA(seconds):
             return seconds  # Already formatted
 
-        total_seconds = int(seconds.rstrip('s'))
-        days, remainder = divmod(total_seconds, 86400)
-        hours, remainder = divmod(remainder, 3600)
-        minutes, secs = divmod(remainder, 60)
-
-        parts = []
-        if days:
-            parts.append(f"{days}d")
-        if hours:
-            parts.append(f"{hours}h")
-        if minutes:
-            parts.append(f"{minutes}m")
-        if secs or not parts:
-            parts.append(f"{secs}s")
-
-        return " ".join(parts)
+        total_seconds = _int(seconds.rstrip('s'))
+        days, remainder = _divmod(total_seconds, 86400)
+        hours, remainder = _divmod(remainder, 3600)
+        minutes, secs = _divmod(remainder, 60)
+
+        parts = [
+            f"{value}{suffix}"
+            for value, suffix in ((days, 'd'), (hours, 'h'), (minutes, 'm'), (secs, 's'))
+            if value
+        ]
+
+        return " ".join(parts) if parts else "0s"
     except (ValueError, AttributeError):
         return str(seconds)
 
 
-def format_bytes(value: str | int) -> str:
+# Keyword-only underscore parameters pre-bind builtins as locals, as in
+# format_uptime; callers never pass them
+def format_bytes(
+    value: str | int, *, _int=int, _isinstance=isinstance, _bisect=bisect_right
+) -> str:
     """Format bytes to human readable (e.g., '1.5 GB')."""
     try:
-        bytes_val = int(value) if isinstance(value, str) else value
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if bytes_val < 1024:
-                if unit == 'B':
-                    return f"{bytes_val} {unit}"
-                return f"{bytes_val:.1f} {unit}"
-            bytes_val /= 1024
-        return f"{bytes_val:.1f} PB"
+        bytes_val = _int(value) if _isinstance(value, str) else value
+        i = _bisect(_BYTE_DIVISORS, bytes_val) - 1
+        if i <= 0:
+            return f"{bytes_val} B"
+        return f"{bytes_val / _BYTE_DIVISORS[i]:.1f} {_BYTE_UNITS[i]}"
     except (ValueError, TypeError):
         return str(value)
 
@@ -50,8 +63,8 @@ def format_percentage(used: int, total: int) -> float:
     return round((1 - used / total) * 100, 1)
 
 
-def truncate(text: str, max_length: int = 4096) -> str:
+def truncate(text: str, max_length: int = _TELEGRAM_MAX_LENGTH) -> str:
     """Truncate text to fit Telegram message limits."""
     if len(text) <= max_length:
         return text
-    return text[:max_length - 3] + "..."
+    return text[:max_length - len(_ELLIPSIS)] + _ELLIPSIS
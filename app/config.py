@@ -1,13 +1,24 @@
 import json
 import os
 import re
+from collections.abc import Callable
+from functools import lru_cache
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+# Use orjson for config parsing when installed; stdlib json accepts bytes too
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 CONFIG_PATH = Path(__file__).parent.parent / "config.json"
+CERTS_DIR = Path("/app/certs")
+
+_SLUG_INVALID_CHARS = re.compile(r'[^a-z0-9]+')
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class MikroTikDevice:
     """MikroTik device configuration."""
     name: str
@@ -19,7 +30,7 @@ class MikroTikDevice:
     ssl_cert: Path
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Config:
     """Application configuration."""
     telegram_token: str
@@ -32,22 +43,47 @@ class Config:
     mfa_db_path: Path = Path("/data/mfa.db")
     mfa_encryption_key: bytes | None = None
 
+    # Slug index over mikrotik_devices, built in __post_init__
+    _devices_by_slug: dict[str, MikroTikDevice] = field(
+        init=False, repr=False, compare=False
+    )
+
+    # Bound admin_ids.__contains__ for the auth decorators' hot path
+    admin_contains: Callable[[int], bool] = field(
+        init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "admin_contains", self.admin_ids.__contains__)
+        object.__setattr__(
+            self,
+            "_devices_by_slug",
+            {device.slug: device for device in self.mikrotik_devices},
+        )
+
     def get_mikrotik_device(self, slug: str) -> MikroTikDevice | None:
         """Get a MikroTik device by its slug."""
-        for device in self.mikrotik_devices:
-            if device.slug == slug:
-                return device
-        return None
+        return self._devices_by_slug.get(slug)
 
 
+@lru_cache(maxsize=256)
 def _slugify(name: str) -> str:
     """Convert device name to a URL/callback-safe slug."""
     slug = name.lower().strip()
-    slug = re.sub(r'[^a-z0-9]+', '_', slug)
+    slug = _SLUG_INVALID_CHARS.sub('_', slug)
     slug = slug.strip('_')
     return slug
 
 
+def _list_certs(directory: Path) -> frozenset[str]:
+    """List certificate filenames in a directory with a single scan."""
+    try:
+        with os.scandir(directory) as entries:
+            return frozenset(entry.name for entry in entries if entry.is_file())
+    except (FileNotFoundError, NotADirectoryError):
+        return frozenset()
+
+
 def _get_env(name: str, required: bool = True) -> str:
     """Get environment variable."""
     value = os.getenv(name)
@@ -61,12 +97,14 @@ def load_config() -> Config:
     if not CONFIG_PATH.exists():
         raise FileNotFoundError(f"Config file not found: {CONFIG_PATH}")
 
-    with open(CONFIG_PATH) as f:
-        data = json.load(f)
+    with open(CONFIG_PATH, 'rb') as f:
+        data = _json_loads(f.read())
 
     # Telegram config
     telegram_token = _get_env("TELEGRAM_BOT_TOKEN")
-    admin_ids = frozenset(data.get("telegram", {}).get("admin_ids", []))
+    admin_ids = frozenset(
+        int(admin_id) for admin_id in data.get("telegram", {}).get("admin_ids", [])
+    )
 
     if not admin_ids:
         raise ValueError("No admin_ids configured in config.json")
@@ -74,6 +112,7 @@ def load_config() -> Config:
     # MikroTik devices
     mikrotik_devices = []
     base_path = Path(__file__).parent
+    known_certs: frozenset[str] | None = None
 
     for device_data in data.get("devices", {}).get("mikrotik", []):
         name = device_data["name"]
@@ -93,14 +132,19 @@ def load_config() -> Config:
         if ssl_cert_path.startswith('/'):
             # Absolute path - use as-is
             ssl_cert = Path(ssl_cert_path)
+            cert_found = ssl_cert.exists()
         elif '/' in ssl_cert_path:
             # Relative path with directory - relative to app/
             ssl_cert = base_path / ssl_cert_path
+            cert_found = ssl_cert.exists()
         else:
             # Just a filename - assume it's in /app/certs/
-            ssl_cert = Path("/app/certs") / ssl_cert_path
+            ssl_cert = CERTS_DIR / ssl_cert_path
+            if known_certs is None:
+                known_certs = _list_certs(CERTS_DIR)
+            cert_found = ssl_cert_path in known_certs
 
-        if not ssl_cert.exists():
+        if not cert_found:
             raise FileNotFoundError(f"SSL certificate not found for {name}: {ssl_cert}")
 
         device = MikroTikDevice(
@@ -149,12 +193,10 @@ def load_config() -> Config:
 
 
 # Singleton config instance
-_config: Config | None = None
-
-
+@lru_cache(maxsize=1)
 def get_config() -> Config:
-    """Get the singleton config instance."""
-    global _config
-    if _config is None:
-        _config = load_config()
-    return _config
+    """Get the singleton config instance.
+
+    Use ``get_config.cache_clear()`` to force a reload.
+    """
+    return load_config()
@@ -1,30 +1,37 @@
 """Telegram bot for infrastructure management."""
 
+import logging
+
 from .bot import create_bot
-from .mikrotik import register_handlers as register_mikrotik_handlers
-from .mfa import initialize_mfa_system, register_mfa_handlers, get_session_manager
 from .config import get_config
-from ._internal import get_logger
+from ._internal import setup_logging
 
-logger = get_logger(__name__)
+logger = logging.getLogger(__name__)
 
 
 async def periodic_cleanup(context) -> None:
     """Periodic task to cleanup expired MFA sessions."""
-    session_manager = get_session_manager()
+    from .mfa import get_session_manager
+
+    session_manager = get_session_manager(context)
     if session_manager:
         session_manager.cleanup_expired()
 
 
 def main() -> None:
     """Run the bot."""
+    setup_logging()
     logger.info("Starting bot...")
 
     config = get_config()
     app = create_bot()
 
     # Initialize MFA system if enabled
+    # Subsystems are imported only once config is known to be valid and,
+    # for MFA, only when enabled
     if config.mfa_enabled:
+        from .mfa import initialize_mfa_system, register_mfa_handlers
+
         logger.info("Initializing MFA system...")
         mfa_db, session_manager = initialize_mfa_system(
             db_path=config.mfa_db_path,
@@ -44,6 +51,8 @@ def main() -> None:
         logger.warning("MFA is disabled in configuration")
 
     # Register handlers for each device type
+    from .mikrotik import register_handlers as register_mikrotik_handlers
+
     register_mikrotik_handlers(app)
     # Future: register_unifi_handlers(app)
     # Future: register_proxmox_handlers(app)
@@ -1,29 +1,40 @@
 """MFA module for Telegram infrastructure bot."""
 
+import importlib
 import logging
 from pathlib import Path
-from typing import Tuple
-
-from .database import MFADatabase
-from .session import SessionManager
-from .decorators import init_mfa_decorators, requires_mfa, requires_mfa_callback
+from typing import TYPE_CHECKING, Tuple
+
+from .decorators import (
+    get_mfa_database,
+    get_session_manager,
+    requires_mfa,
+    requires_mfa_callback,
+)
 from .handlers import register_mfa_handlers
 
+if TYPE_CHECKING:
+    from .database import MFADatabase
+    from .session import SessionManager
+
 logger = logging.getLogger(__name__)
 
-# Module-level instances
-_mfa_db: MFADatabase | None = None
-_session_manager: SessionManager | None = None
+# Classes re-exported lazily so cryptography is only imported when used
+_LAZY_EXPORTS = {
+    'MFADatabase': '.database',
+    'SessionManager': '.session',
+}
 
 
 def initialize_mfa_system(
     db_path: Path,
     encryption_key: bytes,
     session_duration: int
-) -> Tuple[MFADatabase, SessionManager]:
+) -> "Tuple[MFADatabase, SessionManager]":
     """Initialize the MFA system.
 
-    Creates database, session manager, and initializes decorators.
+    Creates database and session manager. register_mfa_handlers() then
+    attaches them to the application's bot_data.
 
     Args:
         db_path: Path to SQLite database file
@@ -33,40 +44,28 @@ def initialize_mfa_system(
     Returns:
         Tuple of (MFADatabase, SessionManager)
     """
-    global _mfa_db, _session_manager
+    from .database import MFADatabase
+    from .session import SessionManager
 
     logger.info(f"Initializing MFA system (db: {db_path}, session: {session_duration}min)")
 
     # Create database
-    _mfa_db = MFADatabase(db_path=db_path, encryption_key=encryption_key)
+    mfa_db = MFADatabase(db_path=db_path, encryption_key=encryption_key)
 
     # Create session manager
-    _session_manager = SessionManager(db=_mfa_db, default_duration=session_duration)
-
-    # Initialize decorators with instances
-    init_mfa_decorators(session_manager=_session_manager, mfa_db=_mfa_db)
+    session_manager = SessionManager(db=mfa_db, default_duration=session_duration)
 
     logger.info("MFA system initialized successfully")
 
-    return _mfa_db, _session_manager
+    return mfa_db, session_manager
 
 
-def get_session_manager() -> SessionManager | None:
-    """Get the global session manager instance.
-
-    Returns:
-        SessionManager instance or None if not initialized
-    """
-    return _session_manager
-
-
-def get_mfa_database() -> MFADatabase | None:
-    """Get the global MFA database instance.
-
-    Returns:
-        MFADatabase instance or None if not initialized
-    """
-    return _mfa_db
+def __getattr__(name: str):
+    """Resolve lazily exported classes on first access."""
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Public API
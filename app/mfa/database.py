@@ -1,17 +1,121 @@
 """SQLite database for MFA user data and sessions."""
 
+import atexit
 import json
 import logging
+import queue
 import sqlite3
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, Optional
 
 from .encryption import EncryptionHelper
 
 logger = logging.getLogger(__name__)
 
+# Per-connection pragmas. WAL lets reads proceed alongside audit-log writes,
+# and NORMAL sync is durable in WAL mode except against power loss.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+def _configure(conn: sqlite3.Connection, db_path: Path | str) -> sqlite3.Connection:
+    """Apply connection pragmas and the sqlite3.Row row factory.
+
+    Args:
+        conn: Freshly opened SQLite connection
+        db_path: Path the connection was opened on
+
+    Returns:
+        The same connection, for chaining
+    """
+    if str(db_path) != ":memory:":
+        conn.execute("PRAGMA journal_mode=WAL")
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+# Audit events are written by a background thread in batches of up to
+# _AUDIT_BATCH_SIZE, waiting at most _AUDIT_FLUSH_INTERVAL seconds to fill one
+_AUDIT_BATCH_SIZE = 50
+_AUDIT_FLUSH_INTERVAL = 0.25
+_AUDIT_STOP = object()
+
+# How long enrollment flags and decrypted secrets are served from memory.
+# Changes made by this process invalidate them immediately; changes made by
+# another process (e.g. scripts/manage_mfa.py) become visible within the TTL.
+_USER_CACHE_TTL = 60.0  # seconds
+
+# Statements on the verification hot path. sqlite3 caches compiled
+# statements per connection keyed by SQL text, and connections are
+# long-lived, so each of these is parsed once per connection.
+_SELECT_ACTIVE_SECRET = """
+    SELECT totp_secret FROM users_mfa
+    WHERE user_id = ? AND is_active = 1
+"""
+
+_SELECT_IS_ENROLLED = """
+    SELECT 1 FROM users_mfa
+    WHERE user_id = ? AND is_active = 1
+"""
+
+_SELECT_SESSION = """
+    SELECT session_id, user_id, created_at, expires_at, last_activity
+    FROM mfa_sessions
+    WHERE session_id = ?
+"""
+
+_SELECT_USER_SESSION_INFO = """
+    SELECT session_id, user_id, created_at, expires_at, last_activity
+    FROM mfa_sessions
+    WHERE user_id = ? AND expires_at > ?
+    ORDER BY expires_at DESC
+    LIMIT 1
+"""
+
+_SELECT_USER_SESSION = """
+    SELECT session_id FROM mfa_sessions
+    WHERE user_id = ? AND expires_at > ?
+    ORDER BY expires_at DESC
+    LIMIT 1
+"""
+
+_SELECT_FAILED_ATTEMPTS = """
+    SELECT failed_attempts,
+           CAST(strftime('%s', last_failed_attempt) AS REAL) AS last_failed
+    FROM users_mfa
+    WHERE user_id = ?
+"""
+
+
+def _utcnow() -> datetime:
+    """Current UTC time as a naive datetime, the format stored in the database."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def iso_to_epoch(timestamp: str) -> float:
+    """Convert a stored naive-UTC ISO-8601 timestamp to a Unix epoch."""
+    return datetime.fromisoformat(timestamp).replace(tzinfo=timezone.utc).timestamp()
+
+
+# Shared compact encoder; json.dumps() with non-default options would build
+# a new JSONEncoder on every call
+_encode_details = json.JSONEncoder(separators=(',', ':')).encode
+
+_INSERT_AUDIT_EVENT = """
+    INSERT INTO mfa_audit_log (user_id, event_type, details)
+    VALUES (?, ?, ?)
+"""
+
 
 class MFADatabase:
     """SQLite database manager for MFA users and sessions."""
@@ -29,12 +133,97 @@ class MFADatabase:
         # Ensure directory exists
         db_path.parent.mkdir(parents=True, exist_ok=True)
 
+        # SQLite allows a single writer: one shared write connection behind a
+        # lock, plus one long-lived read connection per thread
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._writer = self._connect()
+
+        # user_id -> (value, monotonic expiry)
+        self._enrolled_cache: dict[int, tuple[bool, float]] = {}
+        self._secret_cache: dict[int, tuple[str, float]] = {}
+
+        # Expired sessions are purged by the bot's periodic cleanup job,
+        # not here, so startup never waits on a large DELETE
         self._init_db()
-        self._cleanup_expired_sessions()
+
+        # user_id -> (failed attempt count, epoch of last failure or None if
+        # unrecorded). Loaded once; a lockout is re-checked against the
+        # database before it is enforced, so a reset done by another process
+        # (CLI re-enrollment) lifts it immediately.
+        self._failed_attempts: dict[int, tuple[int, float | None]] = {}
+        self._load_failed_attempts()
+
+        self._audit_queue: queue.Queue = queue.Queue()
+        self._audit_thread = threading.Thread(
+            target=self._audit_writer, name="mfa-audit-writer", daemon=True
+        )
+        self._audit_thread.start()
+        atexit.register(self.close)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a configured connection to the MFA database."""
+        conn = _configure(
+            sqlite3.connect(
+                self.db_path, check_same_thread=False, isolation_level=None
+            ),
+            self.db_path,
+        )
+        with self._connections_lock:
+            self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Yield this thread's read connection, opening it on first use."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        yield conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        """Yield the shared write connection inside a committed transaction.
+
+        Connections run in autocommit mode; writes take the RESERVED lock up
+        front with BEGIN IMMEDIATE so they wait on busy_timeout instead of
+        failing with SQLITE_BUSY when upgrading a deferred transaction.
+        """
+        with self._write_lock:
+            conn = self._writer
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _invalidate_user_cache(self, user_id: int) -> None:
+        """Drop cached enrollment state and secret for a user."""
+        self._enrolled_cache.pop(user_id, None)
+        self._secret_cache.pop(user_id, None)
+
+    def close(self) -> None:
+        """Flush pending audit events and close all database connections."""
+        # Drop the exit hook so a closed instance is not kept alive until exit
+        atexit.unregister(self.close)
+
+        if self._audit_thread.is_alive():
+            self._audit_queue.put(_AUDIT_STOP)
+            self._audit_thread.join()
+
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
 
     def _init_db(self) -> None:
         """Initialize database schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS users_mfa (
                     user_id INTEGER PRIMARY KEY,
@@ -70,11 +259,16 @@ class MFADatabase:
             """)
 
             # Create indexes
+            # (user_id, expires_at) serves per-user lookups and the
+            # newest-valid-session range scan; it supersedes the old
+            # single-column user_id index
             conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_sessions_user_id
-                ON mfa_sessions(user_id)
+                CREATE INDEX IF NOT EXISTS idx_sessions_user_expires
+                ON mfa_sessions(user_id, expires_at DESC)
             """)
 
+            conn.execute("DROP INDEX IF EXISTS idx_sessions_user_id")
+
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_sessions_expires_at
                 ON mfa_sessions(expires_at)
@@ -85,8 +279,6 @@ class MFADatabase:
                 ON mfa_audit_log(user_id, timestamp)
             """)
 
-            conn.commit()
-
     # User MFA Management
 
     def enroll_user(self, user_id: int, totp_secret: str) -> None:
@@ -98,14 +290,15 @@ class MFADatabase:
         """
         encrypted_secret = self.encryption.encrypt(totp_secret)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn:
             conn.execute("""
                 INSERT OR REPLACE INTO users_mfa
                 (user_id, totp_secret, created_at, is_active, failed_attempts)
                 VALUES (?, ?, CURRENT_TIMESTAMP, 1, 0)
             """, (user_id, encrypted_secret))
-            conn.commit()
 
+        self._invalidate_user_cache(user_id)
+        self._failed_attempts.pop(user_id, None)
         self.log_event(user_id, 'enrollment', {'method': 'totp'})
         logger.info(f"User {user_id} enrolled in MFA")
 
@@ -118,15 +311,18 @@ class MFADatabase:
         Returns:
             Decrypted TOTP secret or None if not enrolled
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT totp_secret FROM users_mfa
-                WHERE user_id = ? AND is_active = 1
-            """, (user_id,))
+        cached = self._secret_cache.get(user_id)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        with self._read() as conn:
+            cursor = conn.execute(_SELECT_ACTIVE_SECRET, (user_id,))
             row = cursor.fetchone()
 
         if row:
-            return self.encryption.decrypt(row[0])
+            secret = self.encryption.decrypt(row['totp_secret'])
+            self._secret_cache[user_id] = (secret, time.monotonic() + _USER_CACHE_TTL)
+            return secret
         return None
 
     def is_user_enrolled(self, user_id: int) -> bool:
@@ -138,12 +334,16 @@ class MFADatabase:
         Returns:
             True if user is enrolled and active
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT 1 FROM users_mfa
-                WHERE user_id = ? AND is_active = 1
-            """, (user_id,))
-            return cursor.fetchone() is not None
+        cached = self._enrolled_cache.get(user_id)
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+
+        with self._read() as conn:
+            cursor = conn.execute(_SELECT_IS_ENROLLED, (user_id,))
+            enrolled = cursor.fetchone() is not None
+
+        self._enrolled_cache[user_id] = (enrolled, time.monotonic() + _USER_CACHE_TTL)
+        return enrolled
 
     def get_user_info(self, user_id: int) -> Optional[dict]:
         """Get user MFA information.
@@ -154,8 +354,7 @@ class MFADatabase:
         Returns:
             Dictionary with user info or None if not enrolled
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._read() as conn:
             cursor = conn.execute("""
                 SELECT user_id, created_at, last_used_at, is_active
                 FROM users_mfa
@@ -173,13 +372,14 @@ class MFADatabase:
         Args:
             user_id: Telegram user ID
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn:
             conn.execute("""
                 UPDATE users_mfa
                 SET is_active = 0
                 WHERE user_id = ?
             """, (user_id,))
-            conn.commit()
+
+        self._invalidate_user_cache(user_id)
 
         # Invalidate all sessions
         self._invalidate_all_user_sessions(user_id)
@@ -193,8 +393,7 @@ class MFADatabase:
         Returns:
             List of user info dictionaries
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        with self._read() as conn:
             cursor = conn.execute("""
                 SELECT user_id, created_at, last_used_at, is_active
                 FROM users_mfa
@@ -208,13 +407,12 @@ class MFADatabase:
         Args:
             user_id: Telegram user ID
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn:
             conn.execute("""
                 UPDATE users_mfa
                 SET last_used_at = CURRENT_TIMESTAMP
                 WHERE user_id = ?
             """, (user_id,))
-            conn.commit()
 
     # Session Management
 
@@ -229,14 +427,13 @@ class MFADatabase:
             Session ID (UUID)
         """
         session_id = str(uuid.uuid4())
-        expires_at = datetime.utcnow() + timedelta(minutes=duration_minutes)
+        expires_at = _utcnow() + timedelta(minutes=duration_minutes)
 
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn:
             conn.execute("""
                 INSERT INTO mfa_sessions (session_id, user_id, expires_at)
                 VALUES (?, ?, ?)
             """, (session_id, user_id, expires_at.isoformat()))
-            conn.commit()
 
         self.log_event(user_id, 'session_created', {'session_id': session_id, 'duration_minutes': duration_minutes})
         logger.debug(f"Created session {session_id} for user {user_id}")
@@ -251,13 +448,8 @@ class MFADatabase:
         Returns:
             Session dictionary or None if not found
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.execute("""
-                SELECT session_id, user_id, created_at, expires_at, last_activity
-                FROM mfa_sessions
-                WHERE session_id = ?
-            """, (session_id,))
+        with self._read() as conn:
+            cursor = conn.execute(_SELECT_SESSION, (session_id,))
             row = cursor.fetchone()
 
         if row:
@@ -273,16 +465,28 @@ class MFADatabase:
         Returns:
             Session ID or None if no valid session
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT session_id FROM mfa_sessions
-                WHERE user_id = ? AND expires_at > ?
-                ORDER BY created_at DESC
-                LIMIT 1
-            """, (user_id, datetime.utcnow().isoformat()))
+        with self._read() as conn:
+            cursor = conn.execute(_SELECT_USER_SESSION, (user_id, _utcnow().isoformat()))
+            row = cursor.fetchone()
+
+        return row['session_id'] if row else None
+
+    def get_user_session_info(self, user_id: int) -> Optional[dict]:
+        """Get the active session for user in a single query.
+
+        Args:
+            user_id: Telegram user ID
+
+        Returns:
+            Session dictionary or None if no valid session
+        """
+        with self._read() as conn:
+            cursor = conn.execute(_SELECT_USER_SESSION_INFO, (user_id, _utcnow().isoformat()))
             row = cursor.fetchone()
 
-        return row[0] if row else None
+        if row:
+            return dict(row)
+        return None
 
     def invalidate_session(self, session_id: str) -> None:
         """Invalidate a session.
@@ -290,12 +494,11 @@ class MFADatabase:
         Args:
             session_id: Session UUID
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn:
             conn.execute("""
                 DELETE FROM mfa_sessions
                 WHERE session_id = ?
             """, (session_id,))
-            conn.commit()
 
         logger.debug(f"Invalidated session {session_id}")
 
@@ -305,40 +508,69 @@ class MFADatabase:
         Args:
             user_id: Telegram user ID
         """
-        with sqlite3.connect(self.db_path) as conn:
+        with self._write() as conn:
             conn.execute("""
                 DELETE FROM mfa_sessions
                 WHERE user_id = ?
             """, (user_id,))
-            conn.commit()
 
-    def cleanup_expired_sessions(self) -> int:
+    def cleanup_expired_sessions(self, batch_size: int = 1000) -> int:
         """Remove expired sessions from database.
 
+        Deletes in batches, committing after each one, so a large backlog
+        never holds the write lock for long.
+
+        Args:
+            batch_size: Maximum rows deleted per transaction
+
         Returns:
             Number of sessions removed
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                DELETE FROM mfa_sessions
-                WHERE expires_at < ?
-            """, (datetime.utcnow().isoformat(),))
-            conn.commit()
-            count = cursor.rowcount
+        now = _utcnow().isoformat()
+        count = 0
+
+        while True:
+            with self._write() as conn:
+                cursor = conn.execute("""
+                    DELETE FROM mfa_sessions
+                    WHERE rowid IN (
+                        SELECT rowid FROM mfa_sessions
+                        WHERE expires_at < ?
+                        LIMIT ?
+                    )
+                """, (now, batch_size))
+                deleted = cursor.rowcount
+            count += deleted
+            if deleted < batch_size:
+                break
 
         if count > 0:
             logger.debug(f"Cleaned up {count} expired sessions")
         return count
 
-    def _cleanup_expired_sessions(self) -> None:
-        """Internal cleanup called on initialization."""
-        self.cleanup_expired_sessions()
-
     # Rate Limiting
 
+    def _load_failed_attempts(self) -> None:
+        """Rehydrate the in-memory failed-attempt counters from the database."""
+        with self._read() as conn:
+            cursor = conn.execute("""
+                SELECT user_id, failed_attempts,
+                       CAST(strftime('%s', last_failed_attempt) AS REAL) AS last_failed
+                FROM users_mfa
+                WHERE failed_attempts > 0
+            """)
+            self._failed_attempts = {
+                row['user_id']: (row['failed_attempts'], row['last_failed'])
+                for row in cursor
+            }
+
     def is_rate_limited(self, user_id: int, max_attempts: int = 5, window_minutes: int = 15) -> bool:
         """Check if user is rate limited due to failed attempts.
 
+        Answered from in-memory counters. Only a lockout is confirmed
+        against the database, which another process (scripts/manage_mfa.py
+        reset or enroll) may have cleared.
+
         Args:
             user_id: Telegram user ID
             max_attempts: Maximum failed attempts allowed
@@ -347,30 +579,29 @@ class MFADatabase:
         Returns:
             True if user is rate limited
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute("""
-                SELECT failed_attempts, last_failed_attempt
-                FROM users_mfa
-                WHERE user_id = ?
-            """, (user_id,))
-            row = cursor.fetchone()
-
-        if not row:
+        entry = self._failed_attempts.get(user_id)
+        if entry is None:
             return False
 
-        failed_attempts, last_failed = row
+        failed_attempts, last_failed = entry
 
         if failed_attempts < max_attempts:
             return False
 
-        if last_failed:
-            last_failed_time = datetime.fromisoformat(last_failed)
-            window_start = datetime.utcnow() - timedelta(minutes=window_minutes)
+        # No recorded time (NULL) never expires, as before the in-memory cache
+        if last_failed is not None and last_failed < time.time() - window_minutes * 60:
+            # Window expired, reset counter
+            self.reset_failed_attempts(user_id)
+            return False
 
-            if last_failed_time < window_start:
-                # Window expired, reset counter
-                self.reset_failed_attempts(user_id)
-                return False
+        with self._read() as conn:
+            row = conn.execute(_SELECT_FAILED_ATTEMPTS, (user_id,)).fetchone()
+        if row is None or not row['failed_attempts']:
+            self._failed_attempts.pop(user_id, None)
+            return False
+        if row['failed_attempts'] < max_attempts:
+            self._failed_attempts[user_id] = (row['failed_attempts'], row['last_failed'])
+            return False
 
         return True
 
@@ -383,22 +614,19 @@ class MFADatabase:
         Returns:
             New failed attempt count
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
+        with self._write() as conn:
+            cursor = conn.execute("""
                 UPDATE users_mfa
                 SET failed_attempts = failed_attempts + 1,
                     last_failed_attempt = CURRENT_TIMESTAMP
                 WHERE user_id = ?
-            """, (user_id,))
-            conn.commit()
-
-            cursor = conn.execute("""
-                SELECT failed_attempts FROM users_mfa
-                WHERE user_id = ?
+                RETURNING failed_attempts
             """, (user_id,))
             row = cursor.fetchone()
 
-        count = row[0] if row else 0
+        count = row['failed_attempts'] if row else 0
+        if count:
+            self._failed_attempts[user_id] = (count, time.time())
         logger.warning(f"User {user_id} failed MFA attempt #{count}")
         return count
 
@@ -408,14 +636,16 @@ class MFADatabase:
         Args:
             user_id: Telegram user ID
         """
-        with sqlite3.connect(self.db_path) as conn:
+        if self._failed_attempts.pop(user_id, None) is None:
+            return  # Nothing recorded, skip the write
+
+        with self._write() as conn:
             conn.execute("""
                 UPDATE users_mfa
                 SET failed_attempts = 0,
                     last_failed_attempt = NULL
                 WHERE user_id = ?
             """, (user_id,))
-            conn.commit()
 
     # Audit Logging
 
@@ -427,11 +657,42 @@ class MFADatabase:
             event_type: Type of event (enrollment, verification_success, etc.)
             details: Optional dictionary with additional details
         """
-        details_json = json.dumps(details) if details else None
+        # Empty or missing details are stored as NULL
+        details_json = _encode_details(details) if details else None
+
+        # Written asynchronously by _audit_writer; never blocks the caller
+        self._audit_queue.put_nowait((user_id, event_type, details_json))
+
+    def _audit_writer(self) -> None:
+        """Drain the audit queue, inserting each batch in one transaction."""
+        while True:
+            item = self._audit_queue.get()
+            batch = []
+            deadline = time.monotonic() + _AUDIT_FLUSH_INTERVAL
+
+            while item is not _AUDIT_STOP:
+                batch.append(item)
+                timeout = deadline - time.monotonic()
+                if len(batch) >= _AUDIT_BATCH_SIZE or timeout <= 0:
+                    break
+                try:
+                    item = self._audit_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+
+            if batch:
+                self._flush_audit_events(batch)
+            if item is _AUDIT_STOP:
+                return
+
+    def _flush_audit_events(self, batch: list[tuple]) -> None:
+        """Insert a batch of audit events.
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                INSERT INTO mfa_audit_log (user_id, event_type, details)
-                VALUES (?, ?, ?)
-            """, (user_id, event_type, details_json))
-            conn.commit()
+        Args:
+            batch: (user_id, event_type, details_json) tuples
+        """
+        try:
+            with self._write() as conn:
+                conn.executemany(_INSERT_AUDIT_EVENT, batch)
+        except sqlite3.Error:
+            logger.exception(f"Failed to write {len(batch)} audit events")
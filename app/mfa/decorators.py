@@ -2,33 +2,44 @@
 
 import logging
 from functools import wraps
+from typing import TYPE_CHECKING
 
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from .session import SessionManager
-from .database import MFADatabase
+if TYPE_CHECKING:
+    from .session import SessionManager
+    from .database import MFADatabase
 
 logger = logging.getLogger(__name__)
 
-# Module-level instances (initialized by init_mfa_decorators)
-_session_manager: SessionManager | None = None
-_mfa_db: MFADatabase | None = None
+# bot_data keys under which register_mfa_handlers stores the MFA instances
+MFA_DB_KEY = 'mfa_db'
+SESSION_MANAGER_KEY = 'mfa_session_manager'
 
 
-def init_mfa_decorators(session_manager: SessionManager, mfa_db: MFADatabase) -> None:
-    """Initialize MFA decorator system.
+def get_mfa_database(context: ContextTypes.DEFAULT_TYPE) -> "MFADatabase | None":
+    """Get the application's MFA database.
 
-    Must be called before using decorators.
+    Args:
+        context: Handler or job context
+
+    Returns:
+        MFADatabase instance or None if MFA is not initialized
+    """
+    return context.bot_data.get(MFA_DB_KEY)
+
+
+def get_session_manager(context: ContextTypes.DEFAULT_TYPE) -> "SessionManager | None":
+    """Get the application's MFA session manager.
 
     Args:
-        session_manager: SessionManager instance
-        mfa_db: MFADatabase instance
+        context: Handler or job context
+
+    Returns:
+        SessionManager instance or None if MFA is not initialized
     """
-    global _session_manager, _mfa_db
-    _session_manager = session_manager
-    _mfa_db = mfa_db
-    logger.info("MFA decorators initialized")
+    return context.bot_data.get(SESSION_MANAGER_KEY)
 
 
 def requires_mfa(func):
@@ -52,7 +63,10 @@ def requires_mfa(func):
     """
     @wraps(func)
     async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
-        if _session_manager is None or _mfa_db is None:
+        bot_data = context.bot_data
+        session_manager = bot_data.get(SESSION_MANAGER_KEY)
+        mfa_db = bot_data.get(MFA_DB_KEY)
+        if session_manager is None or mfa_db is None:
             logger.error("MFA system not initialized")
             await update.message.reply_text(
                 "MFA system error. Please contact administrator."
@@ -64,7 +78,7 @@ def requires_mfa(func):
             return None
 
         # Check if user is enrolled in MFA
-        if not _mfa_db.is_user_enrolled(user.id):
+        if not mfa_db.is_user_enrolled(user.id):
             await update.message.reply_text(
                 "⚠️ *MFA Required*\n\n"
                 "This command requires Multi-Factor Authentication.\n\n"
@@ -75,7 +89,7 @@ def requires_mfa(func):
             return None
 
         # Check if user has valid session
-        if _session_manager.has_valid_session(user.id):
+        if session_manager.has_valid_session(user.id):
             # Session valid, proceed with command
             logger.info(f"User {user.id} executing {func.__name__} with valid MFA session")
             return await func(update, context, *args, **kwargs)
@@ -104,7 +118,10 @@ def requires_mfa_callback(func):
     """
     @wraps(func)
     async def wrapped(update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs):
-        if _session_manager is None or _mfa_db is None:
+        bot_data = context.bot_data
+        session_manager = bot_data.get(SESSION_MANAGER_KEY)
+        mfa_db = bot_data.get(MFA_DB_KEY)
+        if session_manager is None or mfa_db is None:
             logger.error("MFA system not initialized")
             return None
 
@@ -115,7 +132,7 @@ def requires_mfa_callback(func):
             return None
 
         # Check enrollment
-        if not _mfa_db.is_user_enrolled(user.id):
+        if not mfa_db.is_user_enrolled(user.id):
             await query.answer("MFA required - not enrolled")
             await query.edit_message_text(
                 "⚠️ *MFA Required*\n\n"
@@ -127,7 +144,7 @@ def requires_mfa_callback(func):
             return None
 
         # Check session
-        if _session_manager.has_valid_session(user.id):
+        if session_manager.has_valid_session(user.id):
             logger.info(f"User {user.id} executing callback {func.__name__} with valid MFA session")
             return await func(update, context, *args, **kwargs)
 
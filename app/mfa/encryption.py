@@ -1,22 +1,37 @@
 """Encryption utilities for MFA secrets."""
 
+import atexit
 import base64
-import bcrypt
+import hashlib
+import hmac
+import os
+
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 
+# Derived Fernet keys, keyed by a BLAKE2b digest of the master key so PBKDF2
+# runs once per key per process. Trade-off: the derived key stays in memory
+# for the process lifetime (it already does inside every Fernet instance);
+# the cache is cleared at exit.
+_DERIVED_KEY_CACHE: dict[bytes, bytes] = {}
+atexit.register(_DERIVED_KEY_CACHE.clear)
 
-class EncryptionHelper:
-    """Encrypt/decrypt TOTP secrets using Fernet (AES-128)."""
 
-    def __init__(self, encryption_key: bytes):
-        """Initialize encryption helper with master key.
+def _derive_key(encryption_key: bytes) -> bytes:
+    """Derive a urlsafe-base64 Fernet key from the master key using PBKDF2.
 
-        Args:
-            encryption_key: Master encryption key from environment variable
-        """
-        # Derive Fernet key from master key using PBKDF2
+    Args:
+        encryption_key: Master encryption key
+
+    Returns:
+        Fernet key
+    """
+    cache_key = hashlib.blake2b(encryption_key, digest_size=16).digest()
+    derived_key = _DERIVED_KEY_CACHE.get(cache_key)
+    if derived_key is None:
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
@@ -24,7 +39,51 @@ class EncryptionHelper:
             iterations=100000,
         )
         derived_key = base64.urlsafe_b64encode(kdf.derive(encryption_key))
-        self.fernet = Fernet(derived_key)
+        _DERIVED_KEY_CACHE[cache_key] = derived_key
+    return derived_key
+
+
+def _derive_subkey(encryption_key: bytes, purpose: bytes) -> bytes:
+    """Derive an independent 256-bit key for one purpose with HKDF-SHA256."""
+    return HKDF(
+        algorithm=hashes.SHA256(),
+        length=32,
+        salt=None,
+        info=purpose,
+    ).derive(encryption_key)
+
+
+# Ciphertexts with this prefix are AES-256-GCM (nonce + ciphertext + tag,
+# base64); anything else is a legacy Fernet token
+_AESGCM_PREFIX = "v2:"
+_NONCE_SIZE = 12
+
+
+class EncryptionHelper:
+    """Encrypt/decrypt TOTP secrets using AES-256-GCM.
+
+    Secrets encrypted by earlier versions with Fernet still decrypt.
+    """
+
+    def __init__(self, encryption_key: bytes):
+        """Initialize encryption helper with master key.
+
+        Args:
+            encryption_key: Master encryption key from environment variable
+        """
+        self._aead = AESGCM(_derive_subkey(encryption_key, b'infra-bot-mfa-aesgcm'))
+        self._fernet: Fernet | None = None
+        self._encryption_key = encryption_key
+
+        # Separate server-side key for backup-code HMACs
+        self._backup_key = _derive_subkey(encryption_key, b'infra-bot-mfa-backup-codes')
+
+    @property
+    def fernet(self) -> Fernet:
+        """Legacy Fernet cipher, built on first use (PBKDF2 is slow)."""
+        if self._fernet is None:
+            self._fernet = Fernet(_derive_key(self._encryption_key))
+        return self._fernet
 
     def encrypt(self, plaintext: str) -> str:
         """Encrypt plaintext and return base64 string.
@@ -35,8 +94,9 @@ class EncryptionHelper:
         Returns:
             Base64-encoded encrypted string
         """
-        encrypted = self.fernet.encrypt(plaintext.encode())
-        return encrypted.decode()
+        nonce = os.urandom(_NONCE_SIZE)
+        sealed = self._aead.encrypt(nonce, plaintext.encode(), None)
+        return _AESGCM_PREFIX + base64.b64encode(nonce + sealed).decode()
 
     def decrypt(self, ciphertext: str) -> str:
         """Decrypt from base64 string.
@@ -47,30 +107,36 @@ class EncryptionHelper:
         Returns:
             Decrypted plaintext string
         """
+        if ciphertext.startswith(_AESGCM_PREFIX):
+            raw = base64.b64decode(ciphertext[len(_AESGCM_PREFIX):])
+            nonce, sealed = raw[:_NONCE_SIZE], raw[_NONCE_SIZE:]
+            return self._aead.decrypt(nonce, sealed, None).decode()
+
         decrypted = self.fernet.decrypt(ciphertext.encode())
         return decrypted.decode()
 
-    @staticmethod
-    def hash_backup_code(code: str) -> str:
-        """Hash backup code with bcrypt (one-way).
+    def hash_backup_code(self, code: str) -> str:
+        """Hash backup code with a keyed HMAC-SHA256 (one-way).
+
+        Backup codes are random, not user-chosen, and the HMAC key never
+        leaves the server, so a slow password KDF is not needed.
 
         Args:
             code: Backup code to hash
 
         Returns:
-            Bcrypt hash string
+            Hex digest string
         """
-        return bcrypt.hashpw(code.encode(), bcrypt.gensalt()).decode()
+        return hmac.new(self._backup_key, code.encode(), hashlib.sha256).hexdigest()
 
-    @staticmethod
-    def verify_backup_code(code: str, hashed: str) -> bool:
+    def verify_backup_code(self, code: str, hashed: str) -> bool:
         """Verify backup code against hash.
 
         Args:
             code: Backup code to verify
-            hashed: Bcrypt hash to compare against
+            hashed: Hex digest to compare against
 
         Returns:
             True if code matches hash
         """
-        return bcrypt.checkpw(code.encode(), hashed.encode())
+        return hmac.compare_digest(self.hash_backup_code(code), hashed)
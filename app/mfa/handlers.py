@@ -1,6 +1,7 @@
 """MFA command handlers for Telegram bot."""
 
 import logging
+from typing import TYPE_CHECKING
 
 from telegram import Update
 from telegram.ext import (
@@ -13,16 +14,14 @@ from telegram.ext import (
 
 from ..bot.decorators import restricted
 from ..config import get_config
+from .decorators import MFA_DB_KEY, SESSION_MANAGER_KEY
 from .totp import verify_totp_code
-from .database import MFADatabase
-from .session import SessionManager
 
-logger = logging.getLogger(__name__)
-
-# Module-level instances (set by register_mfa_handlers)
-_mfa_db: MFADatabase | None = None
-_session_manager: SessionManager | None = None
+if TYPE_CHECKING:
+    from .database import MFADatabase
+    from .session import SessionManager
 
+logger = logging.getLogger(__name__)
 
 # --- Status Command ---
 
@@ -30,8 +29,10 @@ _session_manager: SessionManager | None = None
 async def cmd_mfa_auth(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Initiate proactive MFA authentication to create/refresh session."""
     user_id = update.effective_user.id
+    mfa_db = context.bot_data[MFA_DB_KEY]
+    session_manager = context.bot_data[SESSION_MANAGER_KEY]
 
-    if not _mfa_db.is_user_enrolled(user_id):
+    if not mfa_db.is_user_enrolled(user_id):
         await update.message.reply_text(
             "❌ *MFA Not Enabled*\n\n"
             "You are not enrolled in Multi-Factor Authentication.\n\n"
@@ -42,10 +43,10 @@ async def cmd_mfa_auth(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
         return
 
     # Check if user already has a valid session
-    has_session = _session_manager.has_valid_session(user_id)
+    has_session = session_manager.has_valid_session(user_id)
 
     if has_session:
-        session_info = _session_manager.get_session_info(user_id)
+        session_info = session_manager.get_session_info(user_id)
         expires_at = session_info.get('expires_at', 'Unknown') if session_info else 'Unknown'
 
         await update.message.reply_text(
@@ -70,8 +71,10 @@ async def cmd_mfa_auth(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 async def cmd_mfa_status(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Show user's MFA enrollment and session status."""
     user_id = update.effective_user.id
+    mfa_db = context.bot_data[MFA_DB_KEY]
+    session_manager = context.bot_data[SESSION_MANAGER_KEY]
 
-    if not _mfa_db.is_user_enrolled(user_id):
+    if not mfa_db.is_user_enrolled(user_id):
         await update.message.reply_text(
             "❌ *MFA Not Enabled*\n\n"
             "You are not enrolled in Multi-Factor Authentication.\n\n"
@@ -82,20 +85,20 @@ async def cmd_mfa_status(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
 
     # Get user info
-    user_info = _mfa_db.get_user_info(user_id)
-    has_session = _session_manager.has_valid_session(user_id)
+    user_info = mfa_db.get_user_info(user_id)
+    has_session = session_manager.has_valid_session(user_id)
 
     # Format timestamps
     created = user_info.get('created_at', 'Unknown')
     last_used = user_info.get('last_used_at') or 'Never'
 
     status_emoji = "🟢" if has_session else "🔴"
-    session_text = f"Active ({_session_manager.default_duration} min)" if has_session else "No active session"
+    session_text = f"Active ({session_manager.default_duration} min)" if has_session else "No active session"
 
     # Get session details if active
     session_details = ""
     if has_session:
-        session_info = _session_manager.get_session_info(user_id)
+        session_info = session_manager.get_session_info(user_id)
         if session_info:
             expires_at = session_info.get('expires_at', 'Unknown')
             session_details = f"Expires: {expires_at.split('.')[0]} UTC\n"
@@ -132,16 +135,30 @@ async def handle_mfa_verification(update: Update, context: ContextTypes.DEFAULT_
         # Not in MFA verification flow, ignore
         return
 
-    # Validate code format
-    if not message_text.isdigit() or len(message_text) != 6:
+    mfa_db = context.bot_data[MFA_DB_KEY]
+    session_manager = context.bot_data[SESSION_MANAGER_KEY]
+
+    # Validate code format (ASCII only: isdigit() alone accepts other scripts' digits)
+    if len(message_text) != 6 or not (message_text.isascii() and message_text.isdigit()):
         await update.message.reply_text(
             "❌ Invalid code format.\n\n"
             "Please send a 6-digit number from your authenticator app."
         )
         return
 
+    # Check rate limiting first: it is answered from memory, while the
+    # secret lookup may hit the database and decrypt
+    if mfa_db.is_rate_limited(user_id):
+        await update.message.reply_text(
+            "⏸️ *Too Many Failed Attempts*\n\n"
+            "Please wait 15 minutes before trying again.\n\n"
+            "If you've lost access to your authenticator, contact your administrator.",
+            parse_mode='Markdown'
+        )
+        return
+
     # Get user's secret
-    secret = _mfa_db.get_user_secret(user_id)
+    secret = mfa_db.get_user_secret(user_id)
     if not secret:
         await update.message.reply_text(
             "❌ MFA not set up. Please contact your administrator."
@@ -151,22 +168,12 @@ async def handle_mfa_verification(update: Update, context: ContextTypes.DEFAULT_
         context.user_data.pop('mfa_pending_callback', None)
         return
 
-    # Check rate limiting
-    if _mfa_db.is_rate_limited(user_id):
-        await update.message.reply_text(
-            "⏸️ *Too Many Failed Attempts*\n\n"
-            "Please wait 15 minutes before trying again.\n\n"
-            "If you've lost access to your authenticator, contact your administrator.",
-            parse_mode='Markdown'
-        )
-        return
-
     # Verify TOTP code
     if not verify_totp_code(secret, message_text):
-        _mfa_db.increment_failed_attempts(user_id)
-        _mfa_db.log_event(user_id, 'verification_failed', {})
+        failed_attempts = mfa_db.increment_failed_attempts(user_id)
+        mfa_db.log_event(user_id, 'verification_failed', {})
 
-        attempts_left = 5 - _mfa_db.get_user_info(user_id).get('failed_attempts', 0)
+        attempts_left = 5 - failed_attempts
         attempts_text = f"\n\n⚠️ {attempts_left} attempts remaining." if attempts_left > 0 else ""
 
         await update.message.reply_text(
@@ -178,22 +185,22 @@ async def handle_mfa_verification(update: Update, context: ContextTypes.DEFAULT_
         return
 
     # Success! Reset failed attempts and create session
-    _mfa_db.reset_failed_attempts(user_id)
-    _mfa_db.update_last_used(user_id)
-    session_id = _session_manager.create_session(user_id)
-    _mfa_db.log_event(user_id, 'verification_success', {'session_id': session_id})
+    mfa_db.reset_failed_attempts(user_id)
+    mfa_db.update_last_used(user_id)
+    session_id = session_manager.create_session(user_id)
+    mfa_db.log_event(user_id, 'verification_success', {'session_id': session_id})
 
     logger.info(f"User {user_id} successfully verified MFA")
 
     # Get session details
-    session_info = _session_manager.get_session_info(user_id)
+    session_info = session_manager.get_session_info(user_id)
     expires_at = session_info.get('expires_at', 'Unknown') if session_info else 'Unknown'
 
     # Handle proactive authentication
     if proactive_auth:
         await update.message.reply_text(
             f"✅ *Authentication Successful!*\n\n"
-            f"Your MFA session is now active for {_session_manager.default_duration} minutes.\n"
+            f"Your MFA session is now active for {session_manager.default_duration} minutes.\n"
             f"Expires: {expires_at.split('.')[0]} UTC\n\n"
             f"You can now run protected commands like `/upgrade` and `/reboot`.",
             parse_mode='Markdown'
@@ -204,7 +211,7 @@ async def handle_mfa_verification(update: Update, context: ContextTypes.DEFAULT_
     # Handle command/callback continuation
     await update.message.reply_text(
         f"✅ *Verification Successful!*\n\n"
-        f"Your MFA session is active for {_session_manager.default_duration} minutes.\n\n"
+        f"Your MFA session is active for {session_manager.default_duration} minutes.\n\n"
         f"You can now run your command again.",
         parse_mode='Markdown'
     )
@@ -228,7 +235,7 @@ async def handle_mfa_verification(update: Update, context: ContextTypes.DEFAULT_
 
 # --- Registration ---
 
-def register_mfa_handlers(app: Application, mfa_db: MFADatabase, session_manager: SessionManager) -> None:
+def register_mfa_handlers(app: Application, mfa_db: "MFADatabase", session_manager: "SessionManager") -> None:
     """Register all MFA handlers with the bot application.
 
     Args:
@@ -236,9 +243,9 @@ def register_mfa_handlers(app: Application, mfa_db: MFADatabase, session_manager
         mfa_db: MFA database instance
         session_manager: Session manager instance
     """
-    global _mfa_db, _session_manager
-    _mfa_db = mfa_db
-    _session_manager = session_manager
+    # Shared with the MFA decorators and periodic cleanup via bot_data
+    app.bot_data[MFA_DB_KEY] = mfa_db
+    app.bot_data[SESSION_MANAGER_KEY] = session_manager
 
     # Commands
     app.add_handler(CommandHandler("mfa_auth", cmd_mfa_auth))
@@ -248,7 +255,7 @@ def register_mfa_handlers(app: Application, mfa_db: MFADatabase, session_manager
     # Only process messages from admin users (security)
     config = get_config()
     app.add_handler(MessageHandler(
-        filters.TEXT & ~filters.COMMAND & filters.User(user_id=list(config.admin_ids)),
+        filters.TEXT & ~filters.COMMAND & filters.User(user_id=config.admin_ids),
         handle_mfa_verification
     ))
 
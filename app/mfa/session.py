@@ -1,10 +1,12 @@
 """Session management for MFA with in-memory cache."""
 
 import logging
-from datetime import datetime
+import time
+import uuid
+from collections import OrderedDict
 from typing import Optional
 
-from .database import MFADatabase
+from .database import MFADatabase, iso_to_epoch
 
 logger = logging.getLogger(__name__)
 
@@ -12,17 +14,26 @@ logger = logging.getLogger(__name__)
 class SessionManager:
     """Manages MFA sessions with in-memory cache + database persistence."""
 
-    def __init__(self, db: MFADatabase, default_duration: int = 15):
+    def __init__(self, db: MFADatabase, default_duration: int = 15, maxsize: int = 1024):
         """Initialize session manager.
 
         Args:
             db: MFA database instance
             default_duration: Default session duration in minutes
+            maxsize: Maximum number of users kept in the session cache
         """
         self.db = db
         self.default_duration = default_duration
-        # In-memory cache: user_id -> session_id
-        self._cache: dict[int, str] = {}
+        self.maxsize = maxsize
+        # LRU cache: user_id -> (16-byte session UUID, expiry as Unix epoch)
+        self._cache: OrderedDict[int, tuple[bytes, float]] = OrderedDict()
+
+    def _cache_session(self, user_id: int, session_id: str, expires_at: float) -> None:
+        """Store a session in the cache, evicting the least recently used entry."""
+        self._cache[user_id] = (uuid.UUID(session_id).bytes, expires_at)
+        self._cache.move_to_end(user_id)
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
 
     def create_session(self, user_id: int) -> str:
         """Create a new MFA session.
@@ -37,13 +48,15 @@ class SessionManager:
         """
         # Invalidate any existing session
         if user_id in self._cache:
-            old_session_id = self._cache[user_id]
-            self.db.invalidate_session(old_session_id)
+            old_session_id, _ = self._cache[user_id]
+            self.db.invalidate_session(str(uuid.UUID(bytes=old_session_id)))
             logger.debug(f"Invalidated previous session for user {user_id}")
 
-        # Create new session
+        # Create new session; the cached expiry is taken just before the
+        # database's own, so it never outlives the stored session
+        expires_at = time.time() + self.default_duration * 60
         session_id = self.db.create_session(user_id, self.default_duration)
-        self._cache[user_id] = session_id
+        self._cache_session(user_id, session_id, expires_at)
 
         logger.info(f"Created MFA session for user {user_id} (duration: {self.default_duration}min)")
         return session_id
@@ -57,30 +70,24 @@ class SessionManager:
         Returns:
             True if user has an active session
         """
-        # Check cache first
-        if user_id in self._cache:
-            session_id = self._cache[user_id]
-            session = self.db.get_session(session_id)
-
-            if session:
-                # Check if session is expired
-                expires_at = datetime.fromisoformat(session['expires_at'])
-                if expires_at > datetime.utcnow():
-                    logger.debug(f"User {user_id} has valid cached session")
-                    return True
-                else:
-                    # Session expired, clean up cache
-                    logger.debug(f"User {user_id} cached session expired")
-                    del self._cache[user_id]
-            else:
-                # Session not found in DB, clean up cache
-                del self._cache[user_id]
+        # Check cache first; a hit needs no database access
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            if cached[1] > time.time():
+                self._cache.move_to_end(user_id)
+                logger.debug(f"User {user_id} has valid cached session")
+                return True
+
+            # Session expired, clean up cache
+            logger.debug(f"User {user_id} cached session expired")
+            del self._cache[user_id]
 
         # Fallback to database check (in case cache was cleared)
-        session_id = self.db.get_user_session(user_id)
-        if session_id:
+        session = self.db.get_user_session_info(user_id)
+        if session:
             # Update cache
-            self._cache[user_id] = session_id
+            expires_at = iso_to_epoch(session['expires_at'])
+            self._cache_session(user_id, session['session_id'], expires_at)
             logger.debug(f"User {user_id} has valid session (recovered from DB)")
             return True
 
@@ -92,10 +99,9 @@ class SessionManager:
         Args:
             user_id: Telegram user ID
         """
-        if user_id in self._cache:
-            session_id = self._cache[user_id]
-            self.db.invalidate_session(session_id)
-            del self._cache[user_id]
+        cached = self._cache.pop(user_id, None)
+        if cached is not None:
+            self.db.invalidate_session(str(uuid.UUID(bytes=cached[0])))
             logger.info(f"Invalidated session for user {user_id}")
         else:
             # Check DB in case cache was cleared
@@ -105,17 +111,19 @@ class SessionManager:
                 logger.info(f"Invalidated session for user {user_id} (from DB)")
 
     def cleanup_expired(self) -> None:
-        """Remove expired sessions from database.
+        """Remove expired sessions from database and cache.
 
         This should be called periodically (e.g., every 5 minutes).
         """
         count = self.db.cleanup_expired_sessions()
 
-        # Clear cache for safety after cleanup
-        # (Alternatively, we could be smarter and only remove expired entries)
-        if count > 0:
-            self._cache.clear()
-            logger.debug(f"Cleaned up {count} expired sessions, cleared cache")
+        now = time.time()
+        expired = [user_id for user_id, (_, expires_at) in self._cache.items() if expires_at <= now]
+        for user_id in expired:
+            del self._cache[user_id]
+
+        if count > 0 or expired:
+            logger.debug(f"Cleaned up {count} expired sessions, {len(expired)} cache entries")
 
     def get_session_info(self, user_id: int) -> Optional[dict]:
         """Get session information for user.
@@ -126,7 +134,4 @@ class SessionManager:
         Returns:
             Session info dictionary or None if no session
         """
-        session_id = self._cache.get(user_id) or self.db.get_user_session(user_id)
-        if session_id:
-            return self.db.get_session(session_id)
-        return None
+        return self.db.get_user_session_info(user_id)
@@ -1,8 +1,20 @@
 """TOTP (Time-based One-Time Password) utilities using PyOTP."""
 
+import base64
+import hashlib
+import hmac
 import secrets
+import struct
+import time
+from functools import lru_cache
+
 import pyotp
 
+# RFC 6238 parameters used by pyotp.TOTP defaults and authenticator apps
+TOTP_INTERVAL = 30
+TOTP_DIGITS = 6
+_TOTP_MODULUS = 10 ** TOTP_DIGITS
+
 
 def generate_totp_secret() -> str:
     """Generate a new base32 TOTP secret.
@@ -24,8 +36,7 @@ def get_totp_uri(secret: str, user_id: int, issuer: str = "InfraBot") -> str:
     Returns:
         otpauth:// URI for QR code generation
     """
-    totp = pyotp.TOTP(secret)
-    return totp.provisioning_uri(
+    return _totp_for(secret).provisioning_uri(
         name=str(user_id),
         issuer_name=issuer
     )
@@ -42,8 +53,57 @@ def verify_totp_code(secret: str, code: str, valid_window: int = 1) -> bool:
     Returns:
         True if code is valid within the time window
     """
-    totp = pyotp.TOTP(secret)
-    return totp.verify(code, valid_window=valid_window)
+    if not code.isascii():
+        return False  # compare_digest rejects non-ASCII str
+
+    # Each candidate step copies the cached keyed state
+    base = _hmac_base(secret)
+    counter = int(time.time()) // TOTP_INTERVAL
+    # Most codes match the current step, so try it first, then fan out
+    # (0, -1, +1, -2, +2, ...) and stop at the first match
+    if hmac.compare_digest(code, _hotp(base, counter)):
+        return True
+    for distance in range(1, valid_window + 1):
+        if (hmac.compare_digest(code, _hotp(base, counter - distance))
+                or hmac.compare_digest(code, _hotp(base, counter + distance))):
+            return True
+    return False
+
+
+@lru_cache(maxsize=256)
+def _totp_for(secret: str) -> pyotp.TOTP:
+    """Get a cached pyotp.TOTP for a secret."""
+    return pyotp.TOTP(secret)
+
+
+@lru_cache(maxsize=256)
+def _secret_bytes(secret: str) -> bytes:
+    """Decode a base32 secret, tolerating missing padding and lowercase."""
+    padding = -len(secret) % 8
+    return base64.b32decode(secret + "=" * padding, casefold=True)
+
+
+@lru_cache(maxsize=256)
+def _hmac_base(secret: str) -> hmac.HMAC:
+    """Get a keyed HMAC-SHA1 state for a secret, decoded and keyed once.
+
+    Callers must only ever copy() the returned object, never update it.
+    """
+    return hmac.new(_secret_bytes(secret), None, hashlib.sha1)
+
+
+def _hotp(base: hmac.HMAC, counter: int) -> str:
+    """Compute an RFC 4226 HOTP code from a keyed HMAC-SHA1 state.
+
+    The base state is copied, so it can be reused for several counters
+    without repeating the key setup.
+    """
+    h = base.copy()
+    h.update(struct.pack(">Q", counter))
+    digest = h.digest()
+    offset = digest[-1] & 0x0F
+    value = int.from_bytes(digest[offset:offset + 4], "big") & 0x7FFFFFFF
+    return f"{value % _TOTP_MODULUS:0{TOTP_DIGITS}d}"
 
 
 def get_current_totp(secret: str) -> str:
@@ -57,8 +117,7 @@ def get_current_totp(secret: str) -> str:
     Returns:
         Current 6-digit TOTP code
     """
-    totp = pyotp.TOTP(secret)
-    return totp.now()
+    return _hotp(_hmac_base(secret), int(time.time()) // TOTP_INTERVAL)
 
 
 def generate_backup_codes(count: int = 8) -> list[str]:
@@ -70,7 +129,9 @@ def generate_backup_codes(count: int = 8) -> list[str]:
     Returns:
         List of backup codes in format XXXX-XXXX
     """
-    return [
-        f"{secrets.randbelow(10000):04d}-{secrets.randbelow(10000):04d}"
-        for _ in range(count)
-    ]
+    # One entropy draw for all codes: a 32-bit value per 4-digit half keeps
+    # the modulo bias below 1e-5 (with 16-bit values, 0000-5535 would be ~17%
+    # likelier than the rest)
+    raw = secrets.token_bytes(count * 8)
+    halves = [value % 10000 for (value,) in struct.iter_unpack(">I", raw)]
+    return [f"{halves[i]:04d}-{halves[i + 1]:04d}" for i in range(0, len(halves), 2)]
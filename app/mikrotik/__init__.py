@@ -1,4 +1,4 @@
-from .client import MikroTikClient, get_client, get_all_clients
+from .client import MikroTikClient, get_client, get_all_clients, run_on_all
 from ._internal import register_handlers
 
-__all__ = ["MikroTikClient", "get_client", "get_all_clients", "register_handlers"]
+__all__ = ["MikroTikClient", "get_client", "get_all_clients", "run_on_all", "register_handlers"]
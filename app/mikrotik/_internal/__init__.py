@@ -4,7 +4,7 @@ These are framework files that developers rarely need to edit.
 When adding new commands, you only need to edit the files in the parent directory.
 """
 
-from .command_base import SimpleCommand, SensitiveCommand
+from .command_base import SimpleCommand, SensitiveCommand, register_callback_dispatcher
 from .registration import register_handlers
 
-__all__ = ["SimpleCommand", "SensitiveCommand", "register_handlers"]
+__all__ = ["SimpleCommand", "SensitiveCommand", "register_callback_dispatcher", "register_handlers"]
@@ -4,7 +4,9 @@ This module provides a clean, declarative way to define bot commands without boi
 Simply instantiate SimpleCommand or SensitiveCommand with the right parameters!
 """
 
+import asyncio
 import logging
+import re
 from abc import ABC, abstractmethod
 from typing import Callable, Optional
 
@@ -12,9 +14,10 @@ from telegram import Update
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
 
 from ...bot.decorators import restricted, restricted_callback
-from ..client import get_client
+from ..client import MikroTikClient, get_client
 from .. import formatters
-from .keyboards import device_selection_keyboard, confirmation_keyboard
+from .keyboards import device_selection_keyboard, confirmation_keyboard, parse_callback_data
+from .middleware import require_mfa_session
 
 logger = logging.getLogger(__name__)
 
@@ -26,9 +29,57 @@ except ImportError:
         return func
 
 
+# All MikroTik buttons go through one CallbackQueryHandler: the pattern
+# captures the action ("status", "reboot_yes", ...) and the action selects
+# the handler, instead of PTB testing one regex per registered callback.
+CALLBACK_PATTERN = re.compile(r"^mt:([^:]+):(.+)$")
+
+# Callback action -> handler, filled in by CommandBase.register()
+_CALLBACK_ROUTES: dict[str, Callable] = {}
+
+
+async def dispatch_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Route a MikroTik callback query to the handler for its action."""
+    handler = _CALLBACK_ROUTES.get(context.match.group(1))
+    if handler is None:
+        logger.warning(f"No handler for callback data: {update.callback_query.data}")
+        return
+    await handler(update, context)
+
+
+async def _resolve_client(query) -> Optional[MikroTikClient]:
+    """Resolve the device client named in a callback query's data.
+
+    Replies to the user when the device does not exist.
+
+    Returns:
+        The client, or None if the data is malformed or the device unknown
+    """
+    parsed = parse_callback_data(query.data)
+    if parsed is None:
+        logger.warning(f"Invalid callback data format: {query.data}")
+        return None
+    slug = parsed[1]
+
+    client = get_client(slug)
+    if client is None:
+        await query.edit_message_text(f"Device not found: {slug}")
+    return client
+
+
+def register_callback_dispatcher(app: Application) -> None:
+    """Register the single CallbackQueryHandler serving all MikroTik buttons."""
+    app.add_handler(CallbackQueryHandler(dispatch_callback, pattern=CALLBACK_PATTERN))
+
+
 class CommandBase(ABC):
     """Base class for all MikroTik commands."""
 
+    __slots__ = (
+        "name", "description", "client_method", "help_emoji", "callback_prefix",
+        "_client_method_fn",
+    )
+
     def __init__(
         self,
         name: str,
@@ -48,6 +99,8 @@ class CommandBase(ABC):
         self.description = description
         self.client_method = client_method
         self.help_emoji = help_emoji
+        # Resolved once here (fails fast on typos); called as fn(client)
+        self._client_method_fn = getattr(MikroTikClient, client_method)
         self.callback_prefix = f"mt:{name}"
 
     @abstractmethod
@@ -75,6 +128,8 @@ class SimpleCommand(CommandBase):
         )
     """
 
+    __slots__ = ("formatter", "_formatter_fn")
+
     def __init__(
         self,
         name: str,
@@ -94,71 +149,47 @@ class SimpleCommand(CommandBase):
         """
         super().__init__(name, description, client_method, help_emoji)
         self.formatter = formatter
+        self._formatter_fn = getattr(formatters, formatter)
 
     def register(self, app: Application) -> None:
         """Register command and callback handlers."""
         # Command handler: /status, /interfaces, etc.
-        app.add_handler(CommandHandler(self.name, self._create_command_handler()))
-
-        # Callback handler: User clicks device button
-        app.add_handler(
-            CallbackQueryHandler(
-                self._create_callback_handler(),
-                pattern=f"^{self.callback_prefix}:.*$"
-            )
-        )
-
-    def _create_command_handler(self) -> Callable:
-        """Create the /command handler."""
-        @restricted
-        async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            await update.message.reply_text(
-                f"Select a device to view {self.description.lower()}:",
-                reply_markup=device_selection_keyboard(self.name)
-            )
+        app.add_handler(CommandHandler(self.name, restricted(self._cmd)))
 
-        # Set function name for better debugging
-        handler.__name__ = f"cmd_{self.name}"
-        return handler
+        # Callback route: User clicks device button (mt:status:slug)
+        _CALLBACK_ROUTES[self.name] = restricted_callback(self._on_device_selected)
 
-    def _create_callback_handler(self) -> Callable:
-        """Create the callback handler for device selection."""
-        @restricted_callback
-        async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            query = update.callback_query
-            await query.answer()
-
-            # Parse slug from callback data: "mt:status:router_slug"
-            parts = query.data.split(":")
-            if len(parts) != 3:
-                return
-            slug = parts[2]
-
-            # Get client
-            client = get_client(slug)
-            if not client:
-                await query.edit_message_text(f"Device not found: {slug}")
-                return
+    async def _cmd(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle /command: ask which device to query."""
+        await update.message.reply_text(
+            f"Select a device to view {self.description.lower()}:",
+            reply_markup=device_selection_keyboard(self.name)
+        )
 
-            try:
-                # Call client method dynamically
-                data = getattr(client, self.client_method)()
-                identity = client.get_identity()
+    async def _on_device_selected(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle a device button: fetch and show the data."""
+        query = update.callback_query
+        await query.answer()
 
-                # Call formatter dynamically
-                formatter_func = getattr(formatters, self.formatter)
-                message = formatter_func(identity, data)
+        # Callback data: "mt:status:router_slug"
+        client = await _resolve_client(query)
+        if client is None:
+            return
 
-                await query.edit_message_text(message, parse_mode='Markdown')
+        try:
+            # routeros_api blocks; keep the event loop free for other users
+            identity, data = await asyncio.to_thread(
+                client.fetch_with_identity, self._client_method_fn
+            )
+            message = self._formatter_fn(identity, data)
 
-            except Exception as e:
-                logger.error(f"Error in {self.name} for device {slug}: {e}")
-                await query.edit_message_text(
-                    f"Failed to get {self.description.lower()} for {client.device.name}"
-                )
+            await query.edit_message_text(message, parse_mode='Markdown')
 
-        handler.__name__ = f"callback_{self.name}"
-        return handler
+        except Exception as e:
+            logger.error(f"Error in {self.name} for device {client.device.slug}: {e}")
+            await query.edit_message_text(
+                f"Failed to get {self.description.lower()} for {client.device.name}"
+            )
 
 
 class SensitiveCommand(CommandBase):
@@ -176,6 +207,8 @@ class SensitiveCommand(CommandBase):
         )
     """
 
+    __slots__ = ("confirmation_formatter", "_confirmation_fn", "success_message")
+
     def __init__(
         self,
         name: str,
@@ -197,140 +230,84 @@ class SensitiveCommand(CommandBase):
         """
         super().__init__(name, description, client_method, help_emoji)
         self.confirmation_formatter = confirmation_formatter
+        self._confirmation_fn = getattr(formatters, confirmation_formatter)
         self.success_message = success_message
 
     def register(self, app: Application) -> None:
         """Register command and callback handlers with MFA protection."""
         # Command handler: /reboot, /upgrade (with MFA)
-        app.add_handler(CommandHandler(self.name, self._create_command_handler()))
+        app.add_handler(CommandHandler(self.name, restricted(requires_mfa(self._cmd))))
 
-        # Callback: Device selection → show confirmation (pattern: mt:upgrade_confirm:slug)
-        app.add_handler(
-            CallbackQueryHandler(
-                self._create_confirm_handler(),
-                pattern=f"^mt:{self.name}_confirm:.*$"  # Fixed pattern
-            )
-        )
+        # Callback route: Device selection → show confirmation (mt:upgrade_confirm:slug)
+        _CALLBACK_ROUTES[f"{self.name}_confirm"] = restricted_callback(self._on_confirm)
 
-        # Callback: User clicked "Yes" (pattern: mt:upgrade_yes:slug)
-        app.add_handler(
-            CallbackQueryHandler(
-                self._create_execute_handler(),
-                pattern=f"^mt:{self.name}_yes:.*$"  # Fixed pattern
-            )
-        )
+        # Callback route: User clicked "Yes" (mt:upgrade_yes:slug)
+        _CALLBACK_ROUTES[f"{self.name}_yes"] = restricted_callback(self._on_execute)
 
-        # Callback: User clicked "Cancel" (pattern: mt:upgrade_no:slug)
-        app.add_handler(
-            CallbackQueryHandler(
-                self._create_cancel_handler(),
-                pattern=f"^mt:{self.name}_no:.*$"  # Fixed pattern
-            )
+        # Callback route: User clicked "Cancel" (mt:upgrade_no:slug)
+        _CALLBACK_ROUTES[f"{self.name}_no"] = restricted_callback(self._on_cancel)
+
+    async def _cmd(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle /command: ask which device to act on."""
+        await update.message.reply_text(
+            f"Select a device to {self.description.lower()}:",
+            reply_markup=device_selection_keyboard(f"{self.name}_confirm")
         )
 
-    def _create_command_handler(self) -> Callable:
-        """Create the /command handler with MFA."""
-        @restricted
-        @requires_mfa
-        async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            await update.message.reply_text(
-                f"Select a device to {self.description.lower()}:",
-                reply_markup=device_selection_keyboard(f"{self.name}_confirm")
-            )
+    async def _on_confirm(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle a device button: show the confirmation dialog."""
+        query = update.callback_query
+        await query.answer()
+
+        # Callback data: "mt:upgrade_confirm:router_slug"
+        client = await _resolve_client(query)
+        if client is None:
+            return
+
+        # Get confirmation message from formatter
+        message = self._confirmation_fn(client.device.name)
+
+        # Show confirmation keyboard
+        keyboard = confirmation_keyboard(self.name, client.device.slug)
+
+        await query.edit_message_text(
+            message,
+            reply_markup=keyboard,
+            parse_mode='Markdown'
+        )
 
-        handler.__name__ = f"cmd_{self.name}"
-        return handler
+    async def _on_execute(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle "Yes": recheck MFA and run the action."""
+        query = update.callback_query
+        await query.answer()
 
-    def _create_confirm_handler(self) -> Callable:
-        """Create handler to show confirmation dialog."""
-        @restricted_callback
-        async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            query = update.callback_query
-            await query.answer()
+        # MFA recheck: every execute handler belongs to a sensitive command
+        if not await require_mfa_session(update, context):
+            return
 
-            # Parse slug from callback data: "mt:upgrade_confirm:router_slug"
-            parts = query.data.split(":")
-            if len(parts) != 3:  # Changed from 2 to 3
-                logger.warning(f"Invalid callback data format: {query.data}")
-                return
-            slug = parts[2]  # Changed from parts[1] to parts[2]
+        # Callback data: "mt:upgrade_yes:router_slug"
+        client = await _resolve_client(query)
+        if client is None:
+            return
 
-            # Get client
-            client = get_client(slug)
-            if not client:
-                await query.edit_message_text(f"Device not found: {slug}")
-                return
+        await query.edit_message_text(f"⏳ Processing {self.description.lower()}...")
 
-            # Get confirmation message from formatter
-            formatter_func = getattr(formatters, self.confirmation_formatter)
-            message = formatter_func(client.device.name)
+        try:
+            # Execute the action
+            await asyncio.to_thread(self._client_method_fn, client)
 
-            # Show confirmation keyboard
-            keyboard = confirmation_keyboard(self.name, slug)
+            # Success message
+            message = self.success_message.format(device_name=client.device.name)
+            await query.edit_message_text(message, parse_mode='Markdown')
 
+        except Exception as e:
+            logger.error(f"Error executing {self.name} on {client.device.slug}: {e}")
             await query.edit_message_text(
-                message,
-                reply_markup=keyboard,
-                parse_mode='Markdown'
+                f"❌ Failed to {self.description.lower()} {client.device.name}"
             )
 
-        handler.__name__ = f"callback_{self.name}_confirm"
-        return handler
-
-    def _create_execute_handler(self) -> Callable:
-        """Create handler to execute the action with MFA recheck."""
-        @restricted_callback
-        async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            from .middleware import check_mfa_for_callback
-
-            query = update.callback_query
-            await query.answer()
-
-            # Parse slug from callback data: "mt:upgrade_yes:router_slug"
-            parts = query.data.split(":")
-            if len(parts) != 3:  # Changed from 2 to 3
-                logger.warning(f"Invalid callback data format: {query.data}")
-                return
-            slug = parts[2]  # Changed from parts[1] to parts[2]
-
-            # MFA recheck for sensitive action
-            action = f"{self.name}_yes"
-            mfa_passed = await check_mfa_for_callback(update, context, action)
-            if not mfa_passed:
-                return
-
-            # Get client
-            client = get_client(slug)
-            if not client:
-                await query.edit_message_text(f"Device not found: {slug}")
-                return
-
-            await query.edit_message_text(f"⏳ Processing {self.description.lower()}...")
-
-            try:
-                # Execute the action
-                getattr(client, self.client_method)()
-
-                # Success message
-                message = self.success_message.format(device_name=client.device.name)
-                await query.edit_message_text(message, parse_mode='Markdown')
-
-            except Exception as e:
-                logger.error(f"Error executing {self.name} on {slug}: {e}")
-                await query.edit_message_text(
-                    f"❌ Failed to {self.description.lower()} {client.device.name}"
-                )
-
-        handler.__name__ = f"callback_{self.name}_execute"
-        return handler
-
-    def _create_cancel_handler(self) -> Callable:
-        """Create handler for cancel button."""
-        @restricted_callback
-        async def handler(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-            query = update.callback_query
-            await query.answer()
-            await query.edit_message_text("Operation cancelled.")
-
-        handler.__name__ = f"callback_{self.name}_cancel"
-        return handler
+    async def _on_cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Handle "Cancel"."""
+        query = update.callback_query
+        await query.answer()
+        await query.edit_message_text("Operation cancelled.")
@@ -1,11 +1,16 @@
 """Inline keyboard builders for MikroTik bot commands."""
 
+from functools import lru_cache
+from itertools import batched
+
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 from ...config import get_config
 
 # Callback data prefix for MikroTik commands
 CB_PREFIX = "mt"
+_CB_DATA_PREFIX = f"{CB_PREFIX}:"
+_CB_DATA_PREFIX_LEN = len(_CB_DATA_PREFIX)
 
 
 def device_selection_keyboard(action: str) -> InlineKeyboardMarkup:
@@ -17,17 +22,28 @@ def device_selection_keyboard(action: str) -> InlineKeyboardMarkup:
     Returns:
         InlineKeyboardMarkup with device selection buttons arranged in rows of 2
     """
-    config = get_config()
-    buttons = [
+    devices = tuple((device.slug, device.name) for device in get_config().mikrotik_devices)
+    return _device_selection_keyboard_cached(action, devices)
+
+
+@lru_cache(maxsize=64)
+def _device_selection_keyboard_cached(
+    action: str, devices: tuple[tuple[str, str], ...]
+) -> InlineKeyboardMarkup:
+    """Build the device selection keyboard once per (action, devices) pair.
+
+    Markups are immutable, so the same instance can be sent in every reply.
+    Keying on the device list means a config reload gets fresh keyboards.
+    """
+    buttons = (
         InlineKeyboardButton(
-            device.name,
-            callback_data=f"{CB_PREFIX}:{action}:{device.slug}"
+            name,
+            callback_data=f"{CB_PREFIX}:{action}:{slug}"
         )
-        for device in config.mikrotik_devices
-    ]
+        for slug, name in devices
+    )
     # Arrange in rows of 2
-    rows = [buttons[i:i + 2] for i in range(0, len(buttons), 2)]
-    return InlineKeyboardMarkup(rows)
+    return InlineKeyboardMarkup(tuple(batched(buttons, 2)))
 
 
 def confirmation_keyboard(action: str, slug: str) -> InlineKeyboardMarkup:
@@ -80,13 +96,22 @@ def upgrade_available_keyboard(slug: str) -> InlineKeyboardMarkup:
 def parse_callback_data(data: str) -> tuple[str, str] | None:
     """Parse callback data into (action, slug).
 
+    Slices around the fixed prefix instead of splitting, so no intermediate
+    list is built per button press.
+
     Args:
         data: Callback data string in format "prefix:action:slug"
 
     Returns:
-        Tuple of (action, slug) or None if invalid format
+        Tuple of (action, slug), or None unless the data is the prefix
+        followed by exactly two non-empty fields
     """
-    parts = data.split(":")
-    if len(parts) != 3 or parts[0] != CB_PREFIX:
+    if not data.startswith(_CB_DATA_PREFIX):
+        return None
+    sep = data.find(":", _CB_DATA_PREFIX_LEN)
+    if sep <= _CB_DATA_PREFIX_LEN:
+        return None  # no separator, or an empty action
+    slug = data[sep + 1:]
+    if not slug or ":" in slug:
         return None
-    return parts[1], parts[2]
+    return data[_CB_DATA_PREFIX_LEN:sep], slug
@@ -23,7 +23,7 @@ except ImportError:
 # Flow:
 # 1. Command has @requires_mfa (fail-early check for UX)
 # 2. This set is used for execution-time recheck (in case session expired)
-SENSITIVE_ACTIONS: set[str] = set()  # Auto-populated at startup
+SENSITIVE_ACTIONS: frozenset[str] = frozenset()  # Auto-populated at startup
 
 
 async def check_mfa_for_callback(
@@ -45,6 +45,25 @@ async def check_mfa_for_callback(
     if action not in SENSITIVE_ACTIONS:
         return True
 
+    return await require_mfa_session(update, context)
+
+
+async def require_mfa_session(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE
+) -> bool:
+    """Require a valid MFA session for a callback query.
+
+    For callers that already know their action is sensitive, so the
+    SENSITIVE_ACTIONS lookup is skipped.
+
+    Args:
+        update: Telegram update object
+        context: Callback context
+
+    Returns:
+        True if the user has a valid MFA session, False otherwise
+    """
     # If MFA is not available, deny sensitive actions
     if not MFA_AVAILABLE or mfa_decorators is None:
         logger.error("MFA system not available")
@@ -57,14 +76,13 @@ async def check_mfa_for_callback(
         return False
 
     # Access MFA system components
-    if mfa_decorators._session_manager is None or mfa_decorators._mfa_db is None:
+    session_manager = mfa_decorators.get_session_manager(context)
+    mfa_db = mfa_decorators.get_mfa_database(context)
+    if session_manager is None or mfa_db is None:
         logger.error("MFA system not initialized")
         await query.answer("MFA system error")
         return False
 
-    session_manager = mfa_decorators._session_manager
-    mfa_db = mfa_decorators._mfa_db
-
     # Check if user is enrolled
     if not mfa_db.is_user_enrolled(user.id):
         await query.answer("MFA required - not enrolled")
@@ -2,7 +2,7 @@
 
 from telegram.ext import Application, CommandHandler
 
-from ..command_registry import register_all_commands
+from ..command_registry import get_help_text, register_all_commands
 from . import commands
 
 
@@ -15,6 +15,9 @@ def register_handlers(app: Application) -> None:
     # Register convention-based commands (auto-generates everything!)
     register_all_commands(app)
 
+    # Build the (cached) help text now rather than on the first /start
+    get_help_text()
+
     # Register /start and /help (they show dynamically generated help text)
     app.add_handler(CommandHandler("start", commands.cmd_start))
     app.add_handler(CommandHandler("help", commands.cmd_start))
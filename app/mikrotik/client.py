@@ -1,16 +1,178 @@
 """MikroTik RouterOS API client with multi-device support."""
 
+import asyncio
+import atexit
+import os
+import queue
 import ssl
-from contextlib import contextmanager
-from typing import Any, Generator
+import threading
+import time
+import weakref
+from contextlib import contextmanager, suppress
+from functools import lru_cache, wraps
+from typing import Any, Callable, Generator, TypeVar
 
 import routeros_api
+from routeros_api.exceptions import (
+    RouterOsApiConnectionError,
+    RouterOsApiFatalCommunicationError,
+)
 
 from ..config import MikroTikDevice, get_config
 from .._internal import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Persistent connections kept per device; a second one is only opened when
+# two commands hit the same router at once
+_POOL_SIZE = 2
+
+# Seconds a fetched router identity is reused before asking again; it only
+# changes when an admin renames the router
+_IDENTITY_TTL = 300.0
+
+# Errors after which a cached connection can no longer be trusted
+_CONNECTION_ERRORS = (
+    RouterOsApiConnectionError,
+    RouterOsApiFatalCommunicationError,
+    OSError,
+)
+
+
+class _ResumingSSLContext(ssl.SSLContext):
+    """Client SSLContext that resumes the last TLS session per server.
+
+    routeros_api creates and wraps its own sockets, so resumption hooks in
+    here: wrap_socket offers the session last seen for (host, port), which
+    turns a reconnect into an abbreviated handshake when the router accepts
+    it (and falls back to a full one when it does not).
+    """
+
+    def __init__(self, protocol: int):
+        # SSLContext takes the protocol in __new__, not __init__
+        super().__init__()
+        self._sessions: dict[tuple[str, int], ssl.SSLSession] = {}
+
+    def wrap_socket(self, sock, *args, server_hostname=None, session=None, **kwargs):
+        key = (server_hostname, sock.getpeername()[1])
+        if session is None:
+            session = self._sessions.get(key)
+        ssl_sock = super().wrap_socket(
+            sock, *args, server_hostname=server_hostname, session=session, **kwargs
+        )
+        self.remember_session(ssl_sock)
+        return ssl_sock
+
+    def remember_session(self, ssl_sock: ssl.SSLSocket) -> None:
+        """Store a socket's current session for the next connection to its server.
+
+        TLS 1.3 tickets arrive after the handshake, so this is also called
+        just before a connection is closed.
+        """
+        try:
+            session = ssl_sock.session
+            key = (ssl_sock.server_hostname, ssl_sock.getpeername()[1])
+        except (AttributeError, OSError, ValueError):
+            return
+        if session is not None:
+            self._sessions[key] = session
+
+
+# Columns the formatters read; passed as .proplist so the router only
+# sends (and routeros_api only parses) these
+_IDENTITY_FIELDS = "name"
+_RESOURCE_FIELDS = (
+    "cpu-load,free-memory,total-memory,free-hdd-space,total-hdd-space,"
+    "uptime,board-name,version,architecture-name"
+)
+_INTERFACE_FIELDS = "name,type,running,disabled,tx-byte,rx-byte"
+_LOG_FIELDS = "time,topics,message"
+_LEASE_FIELDS = "host-name,address,mac-address,status"
+_SERVICE_FIELDS = "name,port,proto,address,certificate"
+
+
+# Resource handles per live API object. A reconnect creates a new API
+# object, so stale handles disappear along with the old one.
+_resource_cache: weakref.WeakKeyDictionary[Any, dict[str, Any]] = weakref.WeakKeyDictionary()
+
+
+def _res(api, path: str):
+    """Get a cached api.get_resource(path) handle for this API object."""
+    resources = _resource_cache.get(api)
+    if resources is None:
+        resources = _resource_cache[api] = {}
+    resource = resources.get(path)
+    if resource is None:
+        resource = resources[path] = api.get_resource(path)
+    return resource
+
+
+def _print(resource, proplist: str, **queries) -> list[dict]:
+    """Run print on a resource, returning only the proplist columns."""
+    return resource.call('print', {'.proplist': proplist}, queries)
+
+
+def _print_async(resource, proplist: str, **queries):
+    """Send a tagged print without waiting; call .get() on the result for the rows."""
+    return resource.call_async('print', {'.proplist': proplist}, queries)
+
+
+def _identity_name(result: list[dict]) -> str:
+    """Extract the identity name from a /system/identity print."""
+    return result[0].get('name', 'Unknown') if result else 'Unknown'
+
+
+def _retry_on_stale_connection(method: Callable[..., T]) -> Callable[..., T]:
+    """Retry a read-only client method once if its reused connection was dead.
+
+    A pooled connection can die while idle (router reboot, NAT or firewall
+    timeout), which only shows on its next request. Such a failure is
+    retried once on a fresh connection; a fresh connection failing is
+    reported as is. Only for methods that are safe to send twice, so never
+    reboot or install_updates.
+    """
+    @wraps(method)
+    def wrapper(self: "MikroTikClient", *args, **kwargs) -> T:
+        if getattr(self._held, "stale", None) is not None:
+            # Called from another retrying method: the outermost call retries
+            return method(self, *args, **kwargs)
+
+        # connect() sets stale when a reused connection fails
+        self._held.stale = False
+        try:
+            try:
+                return method(self, *args, **kwargs)
+            except _CONNECTION_ERRORS:
+                if not self._held.stale:
+                    raise
+            self._held.stale = False
+            logger.info("Reused connection to %s was dead, retrying", self.device.name)
+            return method(self, *args, **kwargs)
+        finally:
+            self._held.stale = None
+
+    return wrapper
+
+
+@lru_cache(maxsize=None)
+def _ssl_context_for(cert_path: str) -> _ResumingSSLContext:
+    """Build an SSL context trusting the system CAs plus a cert file, once per resolved path.
+
+    SSLContext objects are safe to share between connections, so devices
+    signed by the same CA reuse one context and the PEMs are parsed once.
+    Settings match ssl.create_default_context() followed by
+    load_verify_locations(cafile=cert_path).
+    """
+    logger.debug("Creating SSL context with cert: %s", cert_path)
+    ctx = _ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    ctx.verify_flags |= ssl.VERIFY_X509_PARTIAL_CHAIN | ssl.VERIFY_X509_STRICT
+    ctx.options &= ~ssl.OP_NO_TICKET  # session tickets (the default) for resumption
+    ctx.load_default_certs(ssl.Purpose.SERVER_AUTH)
+    ctx.load_verify_locations(cafile=cert_path)
+    return ctx
+
 
 class MikroTikClient:
     """Client for interacting with a MikroTik router."""
@@ -18,18 +180,25 @@ class MikroTikClient:
     def __init__(self, device: MikroTikDevice):
         self.device = device
         self._ssl_context = self._create_ssl_context()
-        logger.debug(f"Initialized client for device '{device.name}' ({device.host}:{device.port})")
+        # Up to _POOL_SIZE persistent connections, opened on first use (None
+        # marks a free slot). Each is used by one thread at a time since the
+        # API object is not thread-safe; LIFO keeps reusing the warmest one.
+        self._idle: queue.LifoQueue[routeros_api.RouterOsApiPool | None] = queue.LifoQueue()
+        for _ in range(_POOL_SIZE):
+            self._idle.put(None)
+        # Connection held by the current thread, so connect() blocks can nest
+        self._held = threading.local()
+        # (identity, monotonic expiry), cleared on reboot/upgrade
+        self._identity: tuple[str, float] | None = None
+        logger.debug("Initialized client for device '%s' (%s:%s)", device.name, device.host, device.port)
 
     def _create_ssl_context(self) -> ssl.SSLContext:
-        """Create SSL context with the device's certificate."""
-        logger.debug(f"Creating SSL context with cert: {self.device.ssl_cert}")
-        ctx = ssl.create_default_context()
-        ctx.load_verify_locations(cafile=str(self.device.ssl_cert))
-        return ctx
+        """Get the (shared) SSL context for the device's certificate."""
+        return _ssl_context_for(os.path.realpath(self.device.ssl_cert))
 
     def _create_connection(self) -> routeros_api.RouterOsApiPool:
         """Create a new API connection pool."""
-        logger.debug(f"Creating connection to {self.device.host}:{self.device.port}")
+        logger.debug("Creating connection to %s:%s", self.device.host, self.device.port)
         return routeros_api.RouterOsApiPool(
             host=self.device.host,
             port=self.device.port,
@@ -44,124 +213,289 @@ class MikroTikClient:
 
     @contextmanager
     def connect(self) -> Generator[Any, None, None]:
-        """Context manager for API connections."""
-        logger.debug(f"Connecting to {self.device.name}")
-        connection = self._create_connection()
+        """Context manager for API access over one of the device's persistent connections.
+
+        Connections (TCP + TLS + login) are made on demand and reused. One
+        that fails mid-use is dropped, and a later call reconnects (read-only
+        methods retry at once, see _retry_on_stale_connection). Nested
+        connect() blocks in the same thread share the connection.
+        """
+        held = getattr(self._held, "pool", None)
+        if held is not None:
+            yield held.get_api()
+            return
+
+        pool = self._idle.get()
+        reused = pool is not None
         try:
-            yield connection.get_api()
-            logger.debug(f"Connection to {self.device.name} successful")
+            try:
+                if pool is None:
+                    logger.debug("Connecting to %s", self.device.name)
+                    pool = self._create_connection()
+                api = pool.get_api()
+            except BaseException:
+                # Whatever failed (socket, TLS, login trap), never keep a
+                # half-open connection around: its socket would leak
+                self._disconnect(pool)
+                pool = None
+                raise
+            self._held.pool = pool
+            yield api
+        except _CONNECTION_ERRORS:
+            logger.warning("Connection to %s failed, will reconnect", self.device.name)
+            self._disconnect(pool)
+            pool = None
+            if reused and getattr(self._held, "stale", None) is False:
+                # Only tell a retrying caller (_retry_on_stale_connection);
+                # left set elsewhere, the flag would disable its retries
+                self._held.stale = True
+            raise
         finally:
-            connection.disconnect()
-            logger.debug(f"Disconnected from {self.device.name}")
+            self._held.pool = None
+            self._idle.put(pool)
+
+    def _disconnect(self, pool: routeros_api.RouterOsApiPool | None) -> None:
+        """Disconnect a connection, keeping its TLS session for resumption."""
+        if pool is None:
+            return
+        sock = getattr(pool.socket, "socket", None)
+        if isinstance(sock, ssl.SSLSocket):
+            self._ssl_context.remember_session(sock)
+        try:
+            pool.disconnect()
+        except OSError:
+            pass
+        logger.debug("Disconnected from %s", self.device.name)
+
+    def close(self) -> None:
+        """Close the device's idle persistent connections."""
+        pools = []
+        while True:
+            try:
+                pools.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        for pool in pools:
+            self._disconnect(pool)
+            self._idle.put(None)
+
+    @_retry_on_stale_connection
+    def fetch_with_identity(self, method: Callable[["MikroTikClient"], T]) -> tuple[str, T]:
+        """Get the router identity and the result of a client method together.
+
+        A cached identity is used when available. Otherwise both run under
+        one connect() block: the identity query is sent first as a tagged
+        request and its reply is buffered while the method's own request
+        runs, so the two round trips overlap.
+
+        Args:
+            method: Read-only client method to call, e.g. MikroTikClient.get_interfaces
+
+        Returns:
+            Tuple of (identity, method result)
+        """
+        identity = self._cached_identity()
+        if identity is not None:
+            return identity, method(self)
+
+        with self.connect() as api:
+            identity_reply = _print_async(_res(api, '/system/identity'), _IDENTITY_FIELDS)
+            try:
+                data = method(self)
+            except BaseException:
+                # Drain the reply so it does not linger in the tag buffer, but
+                # never let a failure there (dead connection) mask the original
+                with suppress(Exception):
+                    identity_reply.get()
+                raise
+            identity = self._store_identity(identity_reply.get())
+            return identity, data
+
+    def _cached_identity(self) -> str | None:
+        """Get the cached identity if it has not expired."""
+        cached = self._identity
+        if cached is not None and cached[1] > time.monotonic():
+            return cached[0]
+        return None
+
+    def _store_identity(self, result: list[dict]) -> str:
+        """Cache the identity from a /system/identity print and return it."""
+        name = _identity_name(result)
+        self._identity = (name, time.monotonic() + _IDENTITY_TTL)
+        return name
 
     # --- System Commands ---
 
+    @_retry_on_stale_connection
     def get_identity(self) -> str:
         """Get router identity name."""
-        logger.debug(f"Getting identity for {self.device.name}")
+        name = self._cached_identity()
+        if name is not None:
+            return name
+
+        logger.debug("Getting identity for %s", self.device.name)
         with self.connect() as api:
-            identity = api.get_resource('/system/identity')
-            result = identity.get()
-            name = result[0].get('name', 'Unknown') if result else 'Unknown'
-            logger.debug(f"Identity for {self.device.name}: {name}")
+            name = self._store_identity(_print(_res(api, '/system/identity'), _IDENTITY_FIELDS))
+            logger.debug("Identity for %s: %s", self.device.name, name)
             return name
 
+    @_retry_on_stale_connection
     def get_system_resource(self) -> dict:
         """Get system resource information (CPU, memory, uptime, version)."""
-        logger.debug(f"Getting system resources for {self.device.name}")
+        logger.debug("Getting system resources for %s", self.device.name)
         with self.connect() as api:
-            resource = api.get_resource('/system/resource')
-            result = resource.get()
+            result = _print(_res(api, '/system/resource'), _RESOURCE_FIELDS)
             return result[0] if result else {}
 
+    @_retry_on_stale_connection
     def get_interfaces(self) -> list[dict]:
         """Get all interfaces with their status."""
-        logger.debug(f"Getting interfaces for {self.device.name}")
+        logger.debug("Getting interfaces for %s", self.device.name)
         with self.connect() as api:
-            interfaces = api.get_resource('/interface')
-            result = interfaces.get()
-            logger.debug(f"Found {len(result)} interfaces on {self.device.name}")
+            result = _print(_res(api, '/interface'), _INTERFACE_FIELDS)
+            logger.debug("Found %d interfaces on %s", len(result), self.device.name)
             return result
 
+    @_retry_on_stale_connection
     def get_logs(self, limit: int = 20) -> list[dict]:
         """Get recent log entries."""
-        logger.debug(f"Getting last {limit} logs for {self.device.name}")
+        logger.debug("Getting last %s logs for %s", limit, self.device.name)
         with self.connect() as api:
-            logs = api.get_resource('/log')
-            all_logs = logs.get()
+            # The API has no "last N" for /log, so the tail is sliced here;
+            # .proplist still trims every entry to the displayed columns
+            all_logs = _print(_res(api, '/log'), _LOG_FIELDS)
             return all_logs[-limit:] if all_logs else []
 
+    @_retry_on_stale_connection
     def get_dhcp_leases(self) -> list[dict]:
         """Get DHCP server leases."""
-        logger.debug(f"Getting DHCP leases for {self.device.name}")
+        logger.debug("Getting DHCP leases for %s", self.device.name)
         with self.connect() as api:
-            leases = api.get_resource('/ip/dhcp-server/lease')
-            result = leases.get()
-            logger.debug(f"Found {len(result)} DHCP leases on {self.device.name}")
+            result = _print(_res(api, '/ip/dhcp-server/lease'), _LEASE_FIELDS)
+            logger.debug("Found %d DHCP leases on %s", len(result), self.device.name)
             return result
         
+    @_retry_on_stale_connection
     def get_services_all(self) -> list[dict]:
         """Get all IP services on the router."""
-        logger.debug(f"Getting all services for {self.device.name}")
+        logger.debug("Getting all services for %s", self.device.name)
         with self.connect() as api:
-            services = api.get_resource('/ip/service')
+            services = _res(api, '/ip/service')
             return services.get()
         
+    @_retry_on_stale_connection
     def get_services_enabled(self) -> list[dict]:
         """Get enabled services on the router."""
-        logger.debug(f"Getting enabled services for {self.device.name}")
+        logger.debug("Getting enabled services for %s", self.device.name)
         with self.connect() as api:
-            services_enabled = api.get_resource('/ip/service').get(disabled='no', dynamic='no')
-            logger.debug(f"Found {len(services_enabled)} enabled services on {self.device.name}")
+            services_enabled = _print(
+                _res(api, '/ip/service'), _SERVICE_FIELDS, disabled='no', dynamic='no'
+            )
+            logger.debug("Found %d enabled services on %s", len(services_enabled), self.device.name)
             return services_enabled
             
     # --- Update Commands ---
 
+    @_retry_on_stale_connection
     def check_for_updates(self) -> dict:
         """Check for RouterOS updates."""
-        logger.info(f"Checking for updates on {self.device.name}")
+        logger.info("Checking for updates on %s", self.device.name)
         with self.connect() as api:
-            package = api.get_resource('/system/package/update')
+            package = _res(api, '/system/package/update')
             package.call('check-for-updates')
             result = package.get()
             update_info = result[0] if result else {}
             if update_info:
-                logger.info(f"Update check for {self.device.name}: installed={update_info.get('installed-version')}, latest={update_info.get('latest-version')}")
+                logger.info(
+                    "Update check for %s: installed=%s, latest=%s",
+                    self.device.name,
+                    update_info.get('installed-version'),
+                    update_info.get('latest-version'),
+                )
             return update_info
 
     def install_updates(self) -> None:
         """Download and install RouterOS updates (will reboot)."""
-        logger.warning(f"Installing updates on {self.device.name} - device will reboot")
+        logger.warning("Installing updates on %s - device will reboot", self.device.name)
+        self._identity = None
         with self.connect() as api:
-            package = api.get_resource('/system/package/update')
+            package = _res(api, '/system/package/update')
             package.call('install')
-            logger.info(f"Update install command sent to {self.device.name}")
+            logger.info("Update install command sent to %s", self.device.name)
 
     # --- System Control ---
 
     def reboot(self) -> None:
         """Reboot the router."""
-        logger.warning(f"Rebooting {self.device.name}")
+        logger.warning("Rebooting %s", self.device.name)
+        self._identity = None
         with self.connect() as api:
-            system = api.get_resource('/system')
+            system = _res(api, '/system')
             system.call('reboot')
-            logger.info(f"Reboot command sent to {self.device.name}")
+            logger.info("Reboot command sent to %s", self.device.name)
+
+
+# Clients are cached per device so their connections persist across commands
+_clients: dict[MikroTikDevice, MikroTikClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _client_for(device: MikroTikDevice) -> MikroTikClient:
+    """Get the cached client for a device, creating it on first use."""
+    client = _clients.get(device)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(device)
+            if client is None:
+                client = _clients[device] = MikroTikClient(device)
+    return client
+
+
+def close_all_clients() -> None:
+    """Close every cached client's connection (called at exit)."""
+    with _clients_lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_all_clients)
 
 
 def get_client(slug: str) -> MikroTikClient | None:
     """Get a MikroTik client by device slug."""
-    logger.debug(f"Getting client for slug: {slug}")
+    logger.debug("Getting client for slug: %s", slug)
     config = get_config()
     device = config.get_mikrotik_device(slug)
     if device is None:
-        logger.warning(f"Device not found for slug: {slug}")
+        logger.warning("Device not found for slug: %s", slug)
         return None
-    return MikroTikClient(device)
+    return _client_for(device)
 
 
 def get_all_clients() -> list[MikroTikClient]:
     """Get clients for all configured MikroTik devices."""
     config = get_config()
-    clients = [MikroTikClient(device) for device in config.mikrotik_devices]
-    logger.debug(f"Created {len(clients)} MikroTik clients")
+    clients = [_client_for(device) for device in config.mikrotik_devices]
+    logger.debug("Got %d MikroTik clients", len(clients))
     return clients
+
+
+async def run_on_all(method: Callable[[MikroTikClient], T]) -> list[T | BaseException]:
+    """Call a client method on every configured device concurrently.
+
+    routeros_api is blocking, so each call runs in a worker thread and the
+    total time is roughly the slowest device rather than the sum.
+
+    Args:
+        method: Function taking a client, e.g. MikroTikClient.get_identity
+
+    Returns:
+        One result per device, in config order; a failed device yields its
+        exception instead of aborting the others
+    """
+    return await asyncio.gather(
+        *(asyncio.to_thread(method, client) for client in get_all_clients()),
+        return_exceptions=True,
+    )
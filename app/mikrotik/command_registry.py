@@ -4,9 +4,11 @@ This is the ONLY place you need to add new commands.
 Just instantiate SimpleCommand or SensitiveCommand with the right parameters!
 """
 
+from functools import lru_cache
+
 from telegram.ext import Application
 
-from ._internal import SimpleCommand, SensitiveCommand
+from ._internal import SimpleCommand, SensitiveCommand, register_callback_dispatcher
 
 
 # ========================================
@@ -90,9 +92,10 @@ def register_all_commands(app: Application) -> None:
 
     This automatically:
     - Registers all command handlers (/status, /reboot, etc.)
-    - Registers all callback handlers (button clicks)
+    - Routes all callback queries (button clicks) through one dispatcher
     - Applies MFA protection to sensitive commands
     - Updates SENSITIVE_ACTIONS list for middleware
+    - Resets the cached help text
     """
     # Register simple commands
     for cmd in SIMPLE_COMMANDS:
@@ -102,27 +105,37 @@ def register_all_commands(app: Application) -> None:
     for cmd in SENSITIVE_COMMANDS:
         cmd.register(app)
 
+    # One CallbackQueryHandler serves every command's buttons
+    register_callback_dispatcher(app)
+
     # Auto-update SENSITIVE_ACTIONS in middleware
     _update_sensitive_actions()
 
+    # Command lists are final now; drop any help text cached before this
+    get_help_text.cache_clear()
+
 
 def _update_sensitive_actions() -> None:
     """Automatically update SENSITIVE_ACTIONS in middleware based on registered commands."""
     from ._internal import middleware
 
     # Build set of sensitive actions from registered commands
-    sensitive_actions = {
+    sensitive_actions = frozenset(
         f"{cmd.name}_yes"  # Only the actual execution, not _confirm
         for cmd in SENSITIVE_COMMANDS
-    }
+    )
 
     # Update middleware
     middleware.SENSITIVE_ACTIONS = sensitive_actions
 
 
+@lru_cache(maxsize=1)
 def get_help_text() -> str:
     """Generate help text for all commands.
 
+    The text only depends on the command lists above, so it is built once;
+    call ``get_help_text.cache_clear()`` after changing them.
+
     Returns:
         Formatted markdown help text
     """
@@ -1,8 +1,19 @@
 """Message formatters for MikroTik bot responses."""
 
+from functools import lru_cache
+
 from ..bot.formatters import format_bytes, format_uptime
 
 
+def _to_int(data: dict, key: str, default: int = 0) -> int:
+    """Read a numeric RouterOS field (sent as a string) as an int.
+
+    Missing or empty values give the default.
+    """
+    value = data.get(key)
+    return int(value) if value else default
+
+
 def format_status_message(identity: str, resource: dict) -> str:
     """Format system status message.
 
@@ -14,12 +25,12 @@ def format_status_message(identity: str, resource: dict) -> str:
         Formatted markdown message
     """
     cpu_load = resource.get('cpu-load', '?')
-    free_mem = int(resource.get('free-memory', 0))
-    total_mem = int(resource.get('total-memory', 1))
+    free_mem = _to_int(resource, 'free-memory')
+    total_mem = _to_int(resource, 'total-memory', 1)
     mem_used = round((1 - free_mem / total_mem) * 100, 1) if total_mem else 0
 
-    free_disk = int(resource.get('free-hdd-space', 0))
-    total_disk = int(resource.get('total-hdd-space', 1))
+    free_disk = _to_int(resource, 'free-hdd-space')
+    total_disk = _to_int(resource, 'total-hdd-space', 1)
     disk_used = round((1 - free_disk / total_disk) * 100, 1) if total_disk else 0
 
     return f"""*{identity}* - System Status
@@ -45,21 +56,20 @@ def format_interfaces_message(identity: str, interfaces: list[dict]) -> str:
     Returns:
         Formatted markdown message
     """
-    lines = [f"*{identity}* - Network Interfaces\n"]
-
-    for iface in interfaces:
-        name = iface.get('name', '?')
-        iface_type = iface.get('type', '?')
-        running = '✅' if iface.get('running') == 'true' else '❌'
-        disabled = ' (disabled)' if iface.get('disabled') == 'true' else ''
+    header = f"*{identity}* - Network Interfaces\n"
+    return "\n".join([header, *map(_interface_row, interfaces)])
 
-        tx = format_bytes(iface.get('tx-byte', '0'))
-        rx = format_bytes(iface.get('rx-byte', '0'))
 
-        lines.append(f"{running} *{name}*{disabled}")
-        lines.append(f"    {iface_type} | TX: {tx} | RX: {rx}")
-
-    return "\n".join(lines)
+def _interface_row(iface: dict) -> str:
+    """Format one interface as its two message lines."""
+    running = '✅' if iface.get('running') == 'true' else '❌'
+    disabled = ' (disabled)' if iface.get('disabled') == 'true' else ''
+    tx = format_bytes(iface.get('tx-byte', '0'))
+    rx = format_bytes(iface.get('rx-byte', '0'))
+    return (
+        f"{running} *{iface.get('name', '?')}*{disabled}\n"
+        f"    {iface.get('type', '?')} | TX: {tx} | RX: {rx}"
+    )
 
 
 def format_leases_message(identity: str, leases: list[dict]) -> str:
@@ -75,16 +85,15 @@ def format_leases_message(identity: str, leases: list[dict]) -> str:
     if not leases:
         return f"*{identity}*\n\nNo DHCP leases found."
 
-    lines = [f"*{identity}* - DHCP Leases\n"]
+    header = f"*{identity}* - DHCP Leases\n"
+    return "\n".join([header, *map(_lease_row, leases)])
 
-    for lease in leases:
-        hostname = lease.get('host-name', lease.get('mac-address', '?'))
-        ip = lease.get('address', '?')
-        status = lease.get('status', '?')
-        icon = '✅' if status == 'bound' else '⏳'
-        lines.append(f"{icon} *{hostname}*: `{ip}`")
 
-    return "\n".join(lines)
+def _lease_row(lease: dict) -> str:
+    """Format one DHCP lease as a message line."""
+    hostname = lease.get('host-name', lease.get('mac-address', '?'))
+    icon = '✅' if lease.get('status') == 'bound' else '⏳'
+    return f"{icon} *{hostname}*: `{lease.get('address', '?')}`"
 
 
 def format_services_message(identity: str, services: list[dict]) -> str:
@@ -100,20 +109,18 @@ def format_services_message(identity: str, services: list[dict]) -> str:
     if not services:
         return f"*{identity}*\n\nNo enabled IP services found."
 
-    lines = [f"*{identity}* - Enabled IP Services\n"]
+    header = f"*{identity}* - Enabled IP Services\n"
+    return "\n".join([header, *map(_service_row, services)])
 
-    for service in services:
-        name = service.get('name', '?')
-        port = service.get('port', '?')
-        protocol = service.get('proto', '?')
-        address = service.get('address', '?')
-        certificate = service.get('certificate', 'None')
-        lines.append(
-            f"✅ *{name}*: Port *{port}*, Proto *{protocol}*, "
-            f"Address *{address}*, Cert: *{certificate}*"
-        )
 
-    return "\n".join(lines)
+def _service_row(service: dict) -> str:
+    """Format one IP service as a message line."""
+    return (
+        f"✅ *{service.get('name', '?')}*: Port *{service.get('port', '?')}*, "
+        f"Proto *{service.get('proto', '?')}*, "
+        f"Address *{service.get('address', '?')}*, "
+        f"Cert: *{service.get('certificate', 'None')}*"
+    )
 
 
 def format_logs_message(identity: str, logs: list[dict]) -> str:
@@ -129,16 +136,13 @@ def format_logs_message(identity: str, logs: list[dict]) -> str:
     if not logs:
         return f"*{identity}*\n\nNo log entries found."
 
-    lines = [f"*{identity}* - Recent Logs\n```"]
+    header = f"*{identity}* - Recent Logs\n```"
+    return "\n".join([header, *map(_log_row, logs), "```"])
 
-    for entry in logs:
-        time = entry.get('time', '')
-        topics = entry.get('topics', '')
-        message = entry.get('message', '')
-        lines.append(f"{time} [{topics}] {message}")
 
-    lines.append("```")
-    return "\n".join(lines)
+def _log_row(entry: dict) -> str:
+    """Format one log entry as a message line."""
+    return f"{entry.get('time', '')} [{entry.get('topics', '')}] {entry.get('message', '')}"
 
 
 def format_updates_message(identity: str, update_info: dict) -> str:
@@ -154,11 +158,12 @@ def format_updates_message(identity: str, update_info: dict) -> str:
         Formatted markdown message
     """
     installed = update_info.get('installed-version', '?')
-    latest = update_info.get('latest-version', installed)
+    # An empty latest-version (check still running) means no known update
+    latest = update_info.get('latest-version') or installed
     channel = update_info.get('channel', '?')
 
     # Check if update is available
-    update_available = installed != latest and latest != installed
+    update_available = installed != latest
 
     if update_available:
         return f"""*{identity}* - Update Check
@@ -192,6 +197,7 @@ def format_update_available_message(identity: str, update_info: dict) -> str:
     return format_updates_message(identity, update_info)
 
 
+@lru_cache(maxsize=64)
 def format_upgrade_confirmation_message(device_name: str) -> str:
     """Format upgrade confirmation message.
 
@@ -209,6 +215,7 @@ def format_upgrade_confirmation_message(device_name: str) -> str:
     )
 
 
+@lru_cache(maxsize=64)
 def format_reboot_confirmation_message(device_name: str) -> str:
     """Format reboot confirmation message.
 
@@ -5,7 +5,7 @@ MFA Management CLI Tool
 Manage user MFA enrollments for the Telegram infrastructure bot.
 
 Usage:
-  python scripts/manage_mfa.py enroll <user_id>     # Enroll user, show QR code
+  python scripts/manage_mfa.py enroll <user_id> [--png]  # Enroll user, show QR code
   python scripts/manage_mfa.py list                 # List all enrolled users
   python scripts/manage_mfa.py status <user_id>     # Show user's MFA status
   python scripts/manage_mfa.py reset <user_id>      # Remove user's MFA
@@ -15,6 +15,9 @@ Examples:
   # Enroll Telegram user 123456789
   python scripts/manage_mfa.py enroll 123456789
 
+  # Enroll and also save the QR code as a PNG file
+  python scripts/manage_mfa.py enroll 123456789 --png
+
   # List all enrolled users
   python scripts/manage_mfa.py list
 
@@ -30,6 +33,7 @@ Examples:
 
 import sys
 import os
+from functools import lru_cache
 from pathlib import Path
 
 # Add parent directory to path for imports
@@ -40,15 +44,16 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent.parent / ".env"
 load_dotenv(env_path)
 
+# TOTP and QR helpers (pyotp, qrcode, PIL) are imported by the commands
+# that use them, so list/status/reset start without them
 from app.mfa.database import MFADatabase
-from app.mfa.totp import generate_totp_secret, get_totp_uri
-from app.mfa.qr import generate_qr_code, generate_qr_code_ascii
-from app.config import load_config
+from app.config import get_config
 
 
+@lru_cache(maxsize=1)
 def load_mfa_db() -> MFADatabase:
-    """Load MFA database using config settings."""
-    config = load_config()
+    """Load MFA database using config settings, once per run."""
+    config = get_config()
 
     if not config.mfa_enabled:
         print("❌ Error: MFA is disabled in config.json")
@@ -66,12 +71,40 @@ def load_mfa_db() -> MFADatabase:
     )
 
 
-def cmd_enroll(user_id: int) -> None:
+def save_qr_png(uri: str, user_id: int) -> Path:
+    """Render a QR code PNG into mfa_qr_codes/.
+
+    Args:
+        uri: otpauth:// URI to encode
+        user_id: Telegram user ID (used as the file name)
+
+    Returns:
+        Path of the written PNG file
+    """
+    from app.mfa.qr import generate_qr_code
+
+    qr_dir = Path("mfa_qr_codes")
+    qr_dir.mkdir(exist_ok=True)
+    qr_path = qr_dir / f"{user_id}.png"
+
+    qr_buffer = generate_qr_code(uri)
+    with open(qr_path, "wb") as f:
+        # Write the buffer's memory directly instead of copying it out with read()
+        f.write(qr_buffer.getbuffer())
+
+    return qr_path
+
+
+def cmd_enroll(user_id: int, save_png: bool = False) -> None:
     """Enroll a user in MFA.
 
     Args:
         user_id: Telegram user ID to enroll
+        save_png: Also save the QR code as a PNG file
     """
+    from app.mfa.totp import generate_totp_secret, get_totp_uri
+    from app.mfa.qr import generate_qr_code_ascii
+
     db = load_mfa_db()
 
     # Check if already enrolled
@@ -112,16 +145,12 @@ def cmd_enroll(user_id: int) -> None:
         print(f"\n    {secret}\n")
     print("-" * 70)
 
-    # Save QR code as PNG
-    qr_dir = Path("mfa_qr_codes")
-    qr_dir.mkdir(exist_ok=True)
-    qr_path = qr_dir / f"{user_id}.png"
-
-    qr_buffer = generate_qr_code(uri)
-    with open(qr_path, "wb") as f:
-        f.write(qr_buffer.read())
-
-    print(f"\n💾 QR code saved to: {qr_path}")
+    # Save QR code as PNG only on request; the ASCII code is usually scanned
+    if save_png:
+        qr_path = save_qr_png(uri, user_id)
+        print(f"\n💾 QR code saved to: {qr_path}")
+    else:
+        print(f"\n💡 Use 'export-qr {user_id}' to save the QR code as a PNG file")
 
     print("\n" + "=" * 70)
     print("📋 Next steps:")
@@ -227,6 +256,9 @@ def cmd_export_qr(user_id: int) -> None:
     Args:
         user_id: Telegram user ID
     """
+    from app.mfa.totp import get_totp_uri
+    from app.mfa.qr import generate_qr_code_ascii
+
     db = load_mfa_db()
 
     if not db.is_user_enrolled(user_id):
@@ -248,14 +280,7 @@ def cmd_export_qr(user_id: int) -> None:
     print(ascii_qr)
 
     # Save as PNG
-    qr_dir = Path("mfa_qr_codes")
-    qr_dir.mkdir(exist_ok=True)
-    qr_path = qr_dir / f"{user_id}.png"
-
-    qr_buffer = generate_qr_code(uri)
-    with open(qr_path, "wb") as f:
-        f.write(qr_buffer.read())
-
+    qr_path = save_qr_png(uri, user_id)
     print(f"\n💾 QR code saved to: {qr_path}")
 
 
@@ -264,6 +289,41 @@ def print_usage() -> None:
     print(__doc__)
 
 
+def _no_args(argv: list[str]) -> dict:
+    """Parse arguments for commands that take none."""
+    return {}
+
+
+def _user_id_args(argv: list[str]) -> dict:
+    """Parse a leading <user_id> argument.
+
+    Raises:
+        ValueError: If the user_id is missing or not a number
+    """
+    if not argv:
+        raise ValueError("Missing user_id argument")
+    try:
+        return {"user_id": int(argv[0])}
+    except ValueError:
+        raise ValueError("user_id must be a number") from None
+
+
+def _enroll_args(argv: list[str]) -> dict:
+    """Parse <user_id> [--png] for enroll."""
+    return {**_user_id_args(argv), "save_png": "--png" in argv[1:]}
+
+
+# Subcommand -> (handler, argument usage, argument parser). The parser turns
+# the arguments after the command into the handler's keyword arguments.
+_CMDS = {
+    "enroll":    (cmd_enroll,    "<user_id> [--png]", _enroll_args),
+    "list":      (cmd_list,      "",                  _no_args),
+    "status":    (cmd_status,    "<user_id>",         _user_id_args),
+    "reset":     (cmd_reset,     "<user_id>",         _user_id_args),
+    "export-qr": (cmd_export_qr, "<user_id>",         _user_id_args),
+}
+
+
 def main() -> None:
     """Main entry point."""
     if len(sys.argv) < 2:
@@ -271,63 +331,22 @@ def main() -> None:
         sys.exit(1)
 
     command = sys.argv[1].lower()
+    entry = _CMDS.get(command)
+    if entry is None:
+        print(f"❌ Error: Unknown command '{command}'")
+        print_usage()
+        sys.exit(1)
+    handler, args_usage, parse_args = entry
 
     try:
-        if command == "enroll":
-            if len(sys.argv) < 3:
-                print("❌ Error: Missing user_id argument")
-                print("Usage: python scripts/manage_mfa.py enroll <user_id>")
-                sys.exit(1)
-            try:
-                user_id = int(sys.argv[2])
-            except ValueError:
-                print("❌ Error: user_id must be a number")
-                sys.exit(1)
-            cmd_enroll(user_id)
-
-        elif command == "list":
-            cmd_list()
-
-        elif command == "status":
-            if len(sys.argv) < 3:
-                print("❌ Error: Missing user_id argument")
-                print("Usage: python scripts/manage_mfa.py status <user_id>")
-                sys.exit(1)
-            try:
-                user_id = int(sys.argv[2])
-            except ValueError:
-                print("❌ Error: user_id must be a number")
-                sys.exit(1)
-            cmd_status(user_id)
-
-        elif command == "reset":
-            if len(sys.argv) < 3:
-                print("❌ Error: Missing user_id argument")
-                print("Usage: python scripts/manage_mfa.py reset <user_id>")
-                sys.exit(1)
-            try:
-                user_id = int(sys.argv[2])
-            except ValueError:
-                print("❌ Error: user_id must be a number")
-                sys.exit(1)
-            cmd_reset(user_id)
-
-        elif command == "export-qr":
-            if len(sys.argv) < 3:
-                print("❌ Error: Missing user_id argument")
-                print("Usage: python scripts/manage_mfa.py export-qr <user_id>")
-                sys.exit(1)
-            try:
-                user_id = int(sys.argv[2])
-            except ValueError:
-                print("❌ Error: user_id must be a number")
-                sys.exit(1)
-            cmd_export_qr(user_id)
+        kwargs = parse_args(sys.argv[2:])
+    except ValueError as e:
+        print(f"❌ Error: {e}")
+        print(f"Usage: python scripts/manage_mfa.py {command} {args_usage}".rstrip())
+        sys.exit(1)
 
-        else:
-            print(f"❌ Error: Unknown command '{command}'")
-            print_usage()
-            sys.exit(1)
+    try:
+        handler(**kwargs)
 
     except KeyboardInterrupt:
         print("\n\nCancelled.")
@@ -0,0 +1,85 @@
+"""Tests for app.bot.core module."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.bot import core
+from app.bot.core import error_handler
+
+
+class TestErrorHandler:
+    """Tests for error_handler."""
+
+    @pytest.fixture(autouse=True)
+    def clear_debounce(self):
+        core._last_error_reply.clear()
+        yield
+        core._last_error_reply.clear()
+
+    @pytest.fixture
+    def error_context(self):
+        context = MagicMock()
+        context.error = RuntimeError("boom")
+        return context
+
+    async def test_replies_to_user(self, mock_update, error_context):
+        mock_update.effective_chat.id = 1
+
+        await error_handler(mock_update, error_context)
+
+        mock_update.effective_message.reply_text.assert_called_once()
+
+    async def test_debounces_replies_per_chat(self, mock_update, error_context):
+        mock_update.effective_chat.id = 1
+
+        await error_handler(mock_update, error_context)
+        await error_handler(mock_update, error_context)
+
+        mock_update.effective_message.reply_text.assert_called_once()
+
+    async def test_replies_again_after_interval(self, mock_update, error_context):
+        mock_update.effective_chat.id = 1
+
+        with patch("app.bot.core.time.monotonic", side_effect=[100.0, 106.0]):
+            await error_handler(mock_update, error_context)
+            await error_handler(mock_update, error_context)
+
+        assert mock_update.effective_message.reply_text.call_count == 2
+
+    def test_tracked_chats_are_bounded(self):
+        with patch.object(core, "_ERROR_REPLY_MAX_CHATS", 3):
+            for chat_id in range(5):
+                core._should_reply_to_error(chat_id)
+
+        assert list(core._last_error_reply) == [2, 3, 4]
+
+    async def test_no_update(self, error_context):
+        await error_handler(None, error_context)
+
+
+class TestCreateBot:
+    """Tests for create_bot."""
+
+    @pytest.fixture(autouse=True)
+    def config(self):
+        config = MagicMock(telegram_token="123456:ABC")
+        with patch.object(core, "get_config", return_value=config):
+            yield config
+
+    def test_builds_without_rate_limiter(self):
+        with patch.object(core, "AIORateLimiter", None):
+            app = core.create_bot()
+
+        assert app.bot.token == "123456:ABC"
+
+    def test_installs_rate_limiter_when_available(self):
+        limiter_cls = MagicMock()
+        builder = MagicMock()
+        builder.token.return_value = builder
+        builder.rate_limiter.return_value = builder
+        with patch.object(core, "AIORateLimiter", limiter_cls), \
+                patch.object(core, "ApplicationBuilder", return_value=builder):
+            core.create_bot()
+
+        builder.rate_limiter.assert_called_once_with(limiter_cls.return_value)
@@ -82,6 +82,30 @@ class TestRestrictedDecorator:
             mock_logger.warning.assert_called_once()
             assert "999999999" in str(mock_logger.warning.call_args)
 
+    async def test_reads_config_once(self, sample_config, mock_update, mock_context):
+        """Admin IDs should be resolved from config once, not per update."""
+
+        @restricted
+        async def test_handler(update, context):
+            return "success"
+
+        with patch("app.bot.decorators.get_config", return_value=sample_config) as mock_get_config:
+            await test_handler(mock_update, mock_context)
+            await test_handler(mock_update, mock_context)
+
+        mock_get_config.assert_called_once()
+
+    async def test_forwards_extra_arguments(self, mock_config, mock_update, mock_context):
+        """Handlers with extra parameters should still receive them."""
+
+        @restricted
+        async def test_handler(update, context, device_slug):
+            return device_slug
+
+        result = await test_handler(mock_update, mock_context, "router")
+
+        assert result == "router"
+
 
 class TestRestrictedCallbackDecorator:
     """Tests for @restricted_callback decorator."""
@@ -9,9 +9,20 @@ from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
+from app.bot.decorators import _reset_decorator_cache
 from app.config import Config, MikroTikDevice
 
 
+# --- Cache Fixtures ---
+
+@pytest.fixture(autouse=True)
+def reset_decorator_cache():
+    """Drop admin IDs cached by the auth decorators between tests."""
+    _reset_decorator_cache()
+    yield
+    _reset_decorator_cache()
+
+
 # --- Environment Fixtures ---
 
 @pytest.fixture
@@ -286,6 +297,21 @@ def mock_mikrotik_api() -> MagicMock:
     system_control = MagicMock()
     system_control.call = MagicMock()
 
+    # Reads with .proplist go through call("print", ...) or call_async();
+    # answer them with whatever the test configured for get()
+    for resource in (
+        identity_resource, system_resource, interface_resource,
+        log_resource, dhcp_resource, services_resource,
+    ):
+        resource.call.side_effect = (
+            lambda command, *args, _resource=resource: _resource.get.return_value
+        )
+        resource.call_async.side_effect = (
+            lambda command, *args, _resource=resource: MagicMock(
+                get=lambda: _resource.get.return_value
+            )
+        )
+
     def get_resource(path: str) -> MagicMock:
         resources = {
             "/system/identity": identity_resource,
@@ -0,0 +1,243 @@
+"""Tests for app.mfa.database module."""
+
+import sqlite3
+import time
+from unittest.mock import patch
+
+import pytest
+
+from app.mfa import database as database_module
+from app.mfa.database import MFADatabase
+
+SECRET = "JBSWY3DPEHPK3PXP"
+
+
+@pytest.fixture
+def db(tmp_path):
+    """MFA database in a temporary directory."""
+    mfa_db = MFADatabase(db_path=tmp_path / "mfa.db", encryption_key=b"k" * 32)
+    yield mfa_db
+    mfa_db.close()
+
+
+class TestUserEnrollment:
+    """Tests for enrollment and the user caches."""
+
+    def test_enroll_and_get_secret(self, db):
+        db.enroll_user(1, SECRET)
+
+        assert db.is_user_enrolled(1)
+        assert db.get_user_secret(1) == SECRET
+
+    def test_secret_is_stored_encrypted(self, db):
+        db.enroll_user(1, SECRET)
+
+        with db._read() as conn:
+            stored = conn.execute("SELECT totp_secret FROM users_mfa").fetchone()[0]
+        assert SECRET not in stored
+
+    def test_unknown_user(self, db):
+        assert not db.is_user_enrolled(1)
+        assert db.get_user_secret(1) is None
+
+    def test_disable_invalidates_caches(self, db):
+        db.enroll_user(1, SECRET)
+        assert db.is_user_enrolled(1)
+        assert db.get_user_secret(1) == SECRET
+
+        db.disable_user_mfa(1)
+
+        assert not db.is_user_enrolled(1)
+        assert db.get_user_secret(1) is None
+
+    def test_reenroll_replaces_cached_secret(self, db):
+        db.enroll_user(1, SECRET)
+        assert db.get_user_secret(1) == SECRET
+
+        db.enroll_user(1, "KRSXG5CTMVRXEZLU")
+
+        assert db.get_user_secret(1) == "KRSXG5CTMVRXEZLU"
+
+    def test_disable_drops_sessions(self, db):
+        db.enroll_user(1, SECRET)
+        session_id = db.create_session(1, duration_minutes=15)
+
+        db.disable_user_mfa(1)
+
+        assert db.get_session(session_id) is None
+
+
+class TestRateLimiting:
+    """Tests for failed-attempt counting and lockout."""
+
+    def test_increment_returns_new_count(self, db):
+        db.enroll_user(1, SECRET)
+
+        assert [db.increment_failed_attempts(1) for _ in range(3)] == [1, 2, 3]
+
+    def test_increment_for_unknown_user(self, db):
+        assert db.increment_failed_attempts(1) == 0
+        assert not db.is_rate_limited(1)
+
+    def test_locks_out_at_max_attempts(self, db):
+        db.enroll_user(1, SECRET)
+        for _ in range(4):
+            db.increment_failed_attempts(1)
+        assert not db.is_rate_limited(1, max_attempts=5)
+
+        db.increment_failed_attempts(1)
+        assert db.is_rate_limited(1, max_attempts=5)
+
+    def test_lockout_expires_after_window(self, db):
+        db.enroll_user(1, SECRET)
+        for _ in range(5):
+            db.increment_failed_attempts(1)
+
+        later = time.time() + 16 * 60
+        with patch.object(database_module.time, "time", return_value=later):
+            assert not db.is_rate_limited(1, window_minutes=15)
+
+        # The counter was reset, so one more failure does not lock out again
+        assert db.increment_failed_attempts(1) == 1
+
+    def test_reset_failed_attempts(self, db):
+        db.enroll_user(1, SECRET)
+        for _ in range(5):
+            db.increment_failed_attempts(1)
+
+        db.reset_failed_attempts(1)
+
+        assert not db.is_rate_limited(1)
+        assert db.increment_failed_attempts(1) == 1
+
+    def test_reset_by_other_process_lifts_lockout(self, db, tmp_path):
+        db.enroll_user(1, SECRET)
+        for _ in range(5):
+            db.increment_failed_attempts(1)
+        assert db.is_rate_limited(1)
+
+        # scripts/manage_mfa.py reset + enroll, in its own process
+        other = MFADatabase(db_path=tmp_path / "mfa.db", encryption_key=b"k" * 32)
+        try:
+            other.disable_user_mfa(1)
+            other.enroll_user(1, SECRET)
+        finally:
+            other.close()
+
+        assert not db.is_rate_limited(1)
+
+    def test_lockout_without_timestamp_stays_locked(self, db, tmp_path):
+        db.enroll_user(1, SECRET)
+        with db._write() as conn:
+            conn.execute(
+                "UPDATE users_mfa SET failed_attempts = 5, last_failed_attempt = NULL"
+            )
+        db.close()
+
+        reopened = MFADatabase(db_path=tmp_path / "mfa.db", encryption_key=b"k" * 32)
+        try:
+            assert reopened.is_rate_limited(1)
+        finally:
+            reopened.close()
+
+    def test_counters_survive_restart(self, db, tmp_path):
+        db.enroll_user(1, SECRET)
+        for _ in range(5):
+            db.increment_failed_attempts(1)
+        db.close()
+
+        reopened = MFADatabase(db_path=tmp_path / "mfa.db", encryption_key=b"k" * 32)
+        try:
+            assert reopened.is_rate_limited(1)
+        finally:
+            reopened.close()
+
+
+class TestSessions:
+    """Tests for session storage and cleanup."""
+
+    def test_create_and_lookup(self, db):
+        session_id = db.create_session(1, duration_minutes=15)
+
+        assert db.get_session(session_id)["user_id"] == 1
+        assert db.get_user_session(1) == session_id
+        assert db.get_user_session_info(1)["session_id"] == session_id
+
+    def test_expired_session_is_not_active(self, db):
+        db.create_session(1, duration_minutes=-1)
+
+        assert db.get_user_session(1) is None
+        assert db.get_user_session_info(1) is None
+
+    def test_cleanup_deletes_in_batches(self, db):
+        expired = [db.create_session(1, duration_minutes=-1) for _ in range(5)]
+        valid = db.create_session(2, duration_minutes=15)
+
+        with patch.object(db, "_write", wraps=db._write) as write:
+            assert db.cleanup_expired_sessions(batch_size=2) == 5
+
+        # Batches of 2, 2 and 1; the short last batch ends the loop
+        assert write.call_count == 3
+        assert all(db.get_session(session_id) is None for session_id in expired)
+        assert db.get_session(valid) is not None
+
+    def test_cleanup_with_nothing_expired(self, db):
+        db.create_session(1, duration_minutes=15)
+
+        assert db.cleanup_expired_sessions() == 0
+
+
+class TestWrites:
+    """Tests for the shared write transaction."""
+
+    def test_failed_write_rolls_back(self, db):
+        with pytest.raises(RuntimeError):
+            with db._write() as conn:
+                conn.execute(
+                    "INSERT INTO mfa_sessions (session_id, user_id, expires_at) VALUES (?, ?, ?)",
+                    ("partial", 1, "2999-01-01T00:00:00"),
+                )
+                raise RuntimeError("fail mid-transaction")
+
+        assert db.get_session("partial") is None
+
+    def test_writer_usable_after_rollback(self, db):
+        with pytest.raises(sqlite3.IntegrityError):
+            with db._write() as conn:
+                conn.execute("INSERT INTO users_mfa (user_id) VALUES (1)")  # NOT NULL secret
+
+        db.enroll_user(1, SECRET)
+        assert db.is_user_enrolled(1)
+
+
+class TestAuditLog:
+    """Tests for the background audit writer."""
+
+    def test_close_flushes_queued_events(self, tmp_path):
+        db_path = tmp_path / "mfa.db"
+        db = MFADatabase(db_path=db_path, encryption_key=b"k" * 32)
+        for attempt in range(3):
+            db.log_event(1, "verification_failed", {"attempt": attempt})
+        db.log_event(1, "session_created")
+        db.close()
+
+        with sqlite3.connect(db_path) as conn:
+            rows = conn.execute(
+                "SELECT event_type, details FROM mfa_audit_log ORDER BY id"
+            ).fetchall()
+        assert rows == [
+            ("verification_failed", '{"attempt":0}'),
+            ("verification_failed", '{"attempt":1}'),
+            ("verification_failed", '{"attempt":2}'),
+            ("session_created", None),
+        ]
+
+    def test_close_unregisters_exit_hook(self, db):
+        with patch.object(database_module.atexit, "unregister") as unregister:
+            db.close()
+
+        unregister.assert_called_once_with(db.close)
+
+    def test_close_is_idempotent(self, db):
+        db.close()
+        db.close()
@@ -0,0 +1,74 @@
+"""Tests for app.mfa.encryption module."""
+
+import base64
+
+import pytest
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import InvalidToken
+
+from app.mfa.encryption import EncryptionHelper
+
+KEY = b"test-master-key-0123456789abcdef"
+SECRET = "JBSWY3DPEHPK3PXP"
+
+# Fernet token for SECRET under KEY, as written by the original
+# Fernet-only EncryptionHelper. Existing enrollments store this format.
+LEGACY_TOKEN = (
+    "gAAAAABq0VztXI7vJUOZkyDYyxuDQCq1fOXKoOciXN-zrWnQSpzkmUeYs0GJhkCjMXKZeQgechvq2Pw"
+    "dO0Omci3BlaAhuZ9814FrBG2brRtZGY0T75ZROFk="
+)
+
+
+@pytest.fixture
+def helper():
+    return EncryptionHelper(KEY)
+
+
+class TestEncryptionHelper:
+    """Tests for secret encryption."""
+
+    def test_round_trip(self, helper):
+        ciphertext = helper.encrypt(SECRET)
+
+        assert ciphertext.startswith("v2:")
+        assert SECRET not in ciphertext
+        assert helper.decrypt(ciphertext) == SECRET
+
+    def test_round_trip_across_instances(self, helper):
+        assert EncryptionHelper(KEY).decrypt(helper.encrypt(SECRET)) == SECRET
+
+    def test_nonce_is_random(self, helper):
+        assert helper.encrypt(SECRET) != helper.encrypt(SECRET)
+
+    def test_decrypts_legacy_fernet_token(self, helper):
+        assert helper.decrypt(LEGACY_TOKEN) == SECRET
+
+    def test_legacy_token_with_wrong_key_fails(self):
+        with pytest.raises(InvalidToken):
+            EncryptionHelper(b"another-master-key").decrypt(LEGACY_TOKEN)
+
+    def test_tampered_token_fails(self, helper):
+        raw = bytearray(base64.b64decode(helper.encrypt(SECRET)[3:]))
+        raw[-1] ^= 0x01
+        tampered = "v2:" + base64.b64encode(bytes(raw)).decode()
+
+        with pytest.raises(InvalidTag):
+            helper.decrypt(tampered)
+
+    def test_wrong_key_fails(self, helper):
+        with pytest.raises(InvalidTag):
+            EncryptionHelper(b"another-master-key").decrypt(helper.encrypt(SECRET))
+
+
+class TestBackupCodes:
+    """Tests for backup code hashing."""
+
+    def test_verify(self, helper):
+        hashed = helper.hash_backup_code("1234-5678")
+
+        assert helper.verify_backup_code("1234-5678", hashed)
+        assert not helper.verify_backup_code("1234-5679", hashed)
+
+    def test_hash_depends_on_key(self, helper):
+        other = EncryptionHelper(b"another-master-key")
+        assert other.hash_backup_code("1234-5678") != helper.hash_backup_code("1234-5678")
@@ -0,0 +1,126 @@
+"""Tests for app.mfa.totp module."""
+
+from unittest.mock import patch
+
+import pyotp
+import pytest
+
+from app.mfa import totp
+from app.mfa.totp import TOTP_INTERVAL, get_current_totp, verify_totp_code
+
+# RFC 4226 / RFC 6238 SHA-1 test secret: ASCII "12345678901234567890"
+RFC_SECRET = "GEZDGNBVGY3TQOJQGEZDGNBVGY3TQOJQ"
+
+
+def hotp(secret: str, counter: int) -> str:
+    return totp._hotp(totp._hmac_base(secret), counter)
+
+
+class TestHotp:
+    """Tests for the HOTP/TOTP code computation."""
+
+    @pytest.mark.parametrize("counter,expected", list(enumerate([
+        "755224", "287082", "359152", "969429", "338314",
+        "254676", "287922", "162583", "399871", "520489",
+    ])))
+    def test_rfc4226_vectors(self, counter, expected):
+        assert hotp(RFC_SECRET, counter) == expected
+
+    @pytest.mark.parametrize("timestamp,expected", [
+        # RFC 6238 appendix B (SHA-1), truncated to the 6 digits used here
+        (59, "287082"),
+        (1111111109, "081804"),
+        (1111111111, "050471"),
+        (1234567890, "005924"),
+        (2000000000, "279037"),
+        (20000000000, "353130"),
+    ])
+    def test_rfc6238_vectors(self, timestamp, expected):
+        with patch.object(totp.time, "time", return_value=timestamp):
+            assert get_current_totp(RFC_SECRET) == expected
+            assert verify_totp_code(RFC_SECRET, expected, valid_window=0)
+
+    def test_matches_pyotp(self):
+        for _ in range(5):
+            secret = pyotp.random_base32()
+            reference = pyotp.TOTP(secret)
+            for step in range(0, 5000, 37):
+                timestamp = 1_700_000_000 + step * TOTP_INTERVAL
+                with patch.object(totp.time, "time", return_value=timestamp):
+                    assert get_current_totp(secret) == reference.at(timestamp)
+
+    def test_accepts_unpadded_lowercase_secret(self):
+        secret = "jbswy3dpehpk3pxpjbswy3dp"  # 24 chars, needs padding
+        assert hotp(secret, 1) == pyotp.HOTP(secret.upper()).at(1)
+
+    def test_cached_state_is_not_mutated(self):
+        secret = pyotp.random_base32()
+        first = [hotp(secret, counter) for counter in range(3)]
+        assert [hotp(secret, counter) for counter in range(3)] == first
+
+
+class TestVerifyTotpCode:
+    """Tests for verify_totp_code."""
+
+    NOW = 1_700_000_015  # mid-step, so +/- one step stays unambiguous
+
+    @pytest.fixture(autouse=True)
+    def frozen_time(self):
+        with patch.object(totp.time, "time", return_value=self.NOW):
+            yield
+
+    @pytest.fixture(params=[RFC_SECRET, "JBSWY3DPEHPK3PXP"])
+    def secret(self, request):
+        return request.param
+
+    def code_at(self, secret: str, offset: int) -> str:
+        return hotp(secret, self.NOW // TOTP_INTERVAL + offset)
+
+    def test_accepts_current_code(self, secret):
+        assert verify_totp_code(secret, self.code_at(secret, 0))
+
+    @pytest.mark.parametrize("code", [
+        "٢٨٧٠٨٢",     # Arabic-Indic digits
+        "２８７０８２",  # fullwidth digits
+        "28708",      # too short
+        "2870820",    # too long
+        "",
+        "abcdef",
+    ])
+    def test_rejects_malformed_codes(self, code):
+        assert not verify_totp_code(RFC_SECRET, code)
+
+    def test_rejects_wrong_code(self, secret):
+        wrong = f"{(int(self.code_at(secret, 0)) + 1) % 1_000_000:06d}"
+        assert not verify_totp_code(secret, wrong, valid_window=0)
+
+    @pytest.mark.parametrize("offset", [-1, 1])
+    def test_accepts_adjacent_steps(self, secret, offset):
+        assert verify_totp_code(secret, self.code_at(secret, offset), valid_window=1)
+
+    @pytest.mark.parametrize("offset", [-2, 2])
+    def test_rejects_codes_outside_window(self, secret, offset):
+        assert not verify_totp_code(secret, self.code_at(secret, offset), valid_window=1)
+
+    def test_wider_window(self, secret):
+        assert verify_totp_code(secret, self.code_at(secret, -2), valid_window=2)
+        assert not verify_totp_code(secret, self.code_at(secret, 3), valid_window=2)
+
+    def test_zero_window_accepts_current_step_only(self, secret):
+        assert verify_totp_code(secret, self.code_at(secret, 0), valid_window=0)
+        assert not verify_totp_code(secret, self.code_at(secret, 1), valid_window=0)
+
+    @pytest.mark.parametrize("offset,checked", [
+        (0, [0]),
+        (-1, [0, -1]),
+        (1, [0, -1, 1]),
+        (-2, [0, -1, 1, -2]),
+    ])
+    def test_checks_nearest_steps_first_and_stops(self, offset, checked):
+        code = self.code_at(RFC_SECRET, offset)
+        counter = self.NOW // TOTP_INTERVAL
+
+        with patch.object(totp, "_hotp", wraps=totp._hotp) as compute:
+            assert verify_totp_code(RFC_SECRET, code, valid_window=2)
+
+        assert [call.args[1] - counter for call in compute.call_args_list] == checked
@@ -1,17 +1,29 @@
 """Tests for app.mikrotik.client module."""
 
+import threading
 from unittest.mock import MagicMock, patch
-import ssl
 
 import pytest
 
-from app.mikrotik.client import MikroTikClient, get_client, get_all_clients
+from routeros_api.exceptions import RouterOsApiCommunicationError, RouterOsApiConnectionError
+
+from app.mikrotik import client as client_module
+from app.mikrotik.client import MikroTikClient, get_client, get_all_clients, run_on_all
+
+
+@pytest.fixture(autouse=True)
+def isolated_clients():
+    """Run each test against empty client and SSL context caches."""
+    client_module._ssl_context_for.cache_clear()
+    with patch.dict(client_module._clients, clear=True):
+        yield
+    client_module._ssl_context_for.cache_clear()
 
 
 @pytest.fixture
 def mock_ssl_context():
     """Mock SSL context creation."""
-    with patch.object(ssl, "create_default_context") as mock_ctx:
+    with patch.object(client_module, "_ResumingSSLContext") as mock_ctx:
         mock_ctx.return_value = MagicMock()
         yield mock_ctx
 
@@ -25,17 +37,20 @@ class TestMikroTikClient:
         assert client.device == sample_mikrotik_device
 
     def test_connect_context_manager(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
-        """Connect should work as context manager and cleanup."""
+        """Connect should open one connection and keep it for reuse."""
         client = MikroTikClient(sample_mikrotik_device)
 
-        with patch.object(client, "_create_connection", return_value=mock_mikrotik_connection):
+        with patch.object(client, "_create_connection", return_value=mock_mikrotik_connection) as create:
             with client.connect() as api:
                 assert api is not None
+            with client.connect():
+                pass
 
-            mock_mikrotik_connection.disconnect.assert_called_once()
+        create.assert_called_once()
+        mock_mikrotik_connection.disconnect.assert_not_called()
 
-    def test_connect_cleanup_on_exception(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
-        """Connect should cleanup even when exception occurs."""
+    def test_connect_keeps_connection_on_other_exception(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """Errors unrelated to the connection should not drop it."""
         client = MikroTikClient(sample_mikrotik_device)
 
         with patch.object(client, "_create_connection", return_value=mock_mikrotik_connection):
@@ -43,7 +58,159 @@ class TestMikroTikClient:
                 with client.connect():
                     raise ValueError("Test error")
 
-            mock_mikrotik_connection.disconnect.assert_called_once()
+        mock_mikrotik_connection.disconnect.assert_not_called()
+
+    def test_connect_drops_connection_on_connection_error(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """A connection error should drop the connection so the next call reconnects."""
+        client = MikroTikClient(sample_mikrotik_device)
+
+        with patch.object(client, "_create_connection", return_value=mock_mikrotik_connection) as create:
+            with pytest.raises(RouterOsApiConnectionError):
+                with client.connect():
+                    raise RouterOsApiConnectionError("lost")
+            with client.connect():
+                pass
+
+        mock_mikrotik_connection.disconnect.assert_called_once()
+        assert create.call_count == 2
+
+    def test_connect_drops_connection_on_login_error(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """A connection that fails to log in should be closed, not kept for reuse."""
+        client = MikroTikClient(sample_mikrotik_device)
+        failed = MagicMock()
+        failed.get_api.side_effect = RouterOsApiCommunicationError("invalid user name or password", b"")
+
+        with patch.object(client, "_create_connection", side_effect=[failed, mock_mikrotik_connection]) as create:
+            with pytest.raises(RouterOsApiCommunicationError):
+                with client.connect():
+                    pass
+            with client.connect():
+                pass
+
+        failed.disconnect.assert_called_once()
+        assert create.call_count == 2
+
+    def test_read_retries_once_on_dead_reused_connection(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """A read on a reused connection that died should reconnect and succeed."""
+        client = MikroTikClient(sample_mikrotik_device)
+        stale = MagicMock()
+
+        with patch.object(client, "_create_connection", side_effect=[stale, mock_mikrotik_connection]) as create:
+            with client.connect():
+                pass
+            stale.get_api.return_value.get_resource.side_effect = RouterOsApiConnectionError("reset")
+            result = client.get_system_resource()
+
+        assert result["board-name"] == "RB4011"
+        stale.disconnect.assert_called_once()
+        assert create.call_count == 2
+
+    def test_read_on_fresh_connection_is_not_retried(self, sample_mikrotik_device, mock_ssl_context):
+        """A failure on a just-opened connection should be reported, not retried."""
+        client = MikroTikClient(sample_mikrotik_device)
+        broken = MagicMock()
+        broken.get_api.return_value.get_resource.side_effect = RouterOsApiConnectionError("refused")
+
+        with patch.object(client, "_create_connection", return_value=broken) as create:
+            with pytest.raises(RouterOsApiConnectionError):
+                client.get_system_resource()
+
+        create.assert_called_once()
+
+    def test_reboot_is_not_retried(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """Actions must not be re-sent after a connection error, nor break later retries."""
+        client = MikroTikClient(sample_mikrotik_device)
+        stale, later_stale = MagicMock(), MagicMock()
+        connections = [stale, later_stale, mock_mikrotik_connection]
+
+        with patch.object(client, "_create_connection", side_effect=connections) as create:
+            with client.connect():
+                pass
+            stale.get_api.return_value.get_resource.side_effect = RouterOsApiConnectionError("reset")
+            with pytest.raises(RouterOsApiConnectionError):
+                client.reboot()
+            create.assert_called_once()
+
+            # A read on this thread must still retry a dead reused connection
+            with client.connect():
+                pass
+            later_stale.get_api.return_value.get_resource.side_effect = RouterOsApiConnectionError("reset")
+            assert client.get_system_resource()["board-name"] == "RB4011"
+
+        assert create.call_count == 3
+
+    def test_fetch_with_identity_shares_connection(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """Identity and data should be fetched over one connection."""
+        client = MikroTikClient(sample_mikrotik_device)
+
+        with patch.object(client, "_create_connection", return_value=mock_mikrotik_connection) as create:
+            identity, interfaces = client.fetch_with_identity(MikroTikClient.get_interfaces)
+
+        assert identity == "TestRouter"
+        assert interfaces[0]["name"] == "ether1"
+        create.assert_called_once()
+
+    def test_fetch_with_identity_keeps_method_error(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """A failing identity reply should not replace the method's own error."""
+        client = MikroTikClient(sample_mikrotik_device)
+        identity = mock_mikrotik_connection.get_api().get_resource("/system/identity")
+        identity.call_async.side_effect = None
+        identity.call_async.return_value.get.side_effect = RouterOsApiConnectionError("lost")
+
+        def method(c):
+            raise ValueError("bad reply")
+
+        with patch.object(client, "_create_connection", return_value=mock_mikrotik_connection):
+            with pytest.raises(ValueError, match="bad reply"):
+                client.fetch_with_identity(method)
+
+        identity.call_async.return_value.get.assert_called_once()
+
+    def test_concurrent_connects_use_separate_connections(self, sample_mikrotik_device, mock_ssl_context):
+        """A second thread should get its own connection while the first is busy."""
+        client = MikroTikClient(sample_mikrotik_device)
+        first, second = MagicMock(), MagicMock()
+        seen = []
+
+        def worker():
+            with client.connect() as api:
+                seen.append(api)
+
+        with patch.object(client, "_create_connection", side_effect=[first, second]):
+            with client.connect() as api:
+                thread = threading.Thread(target=worker)
+                thread.start()
+                thread.join()
+
+        assert api is first.get_api()
+        assert seen == [second.get_api()]
+
+    def test_close(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """Close should disconnect the persistent connection."""
+        client = MikroTikClient(sample_mikrotik_device)
+
+        with patch.object(client, "_create_connection", return_value=mock_mikrotik_connection):
+            with client.connect():
+                pass
+        client.close()
+
+        mock_mikrotik_connection.disconnect.assert_called_once()
+
+    def test_ssl_context_shared_per_cert(self, sample_mikrotik_device, mock_ssl_context):
+        """Clients using the same certificate should share one SSL context."""
+        first = MikroTikClient(sample_mikrotik_device)
+        second = MikroTikClient(sample_mikrotik_device)
+
+        assert first._ssl_context is second._ssl_context
+        mock_ssl_context.assert_called_once()
+
+    def test_ssl_context_trusts_system_and_device_certs(self, sample_mikrotik_device, mock_ssl_context):
+        """The context should trust the system CA store as well as the device cert."""
+        client = MikroTikClient(sample_mikrotik_device)
+        ctx = client._ssl_context
+
+        ctx.load_default_certs.assert_called_once_with(client_module.ssl.Purpose.SERVER_AUTH)
+        ctx.load_verify_locations.assert_called_once()
 
     def test_get_identity(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
         """Should return router identity."""
@@ -54,6 +221,20 @@ class TestMikroTikClient:
 
         assert identity == "TestRouter"
 
+    def test_get_identity_is_cached(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
+        """Should reuse the identity until the device reboots."""
+        client = MikroTikClient(sample_mikrotik_device)
+        identity_resource = mock_mikrotik_connection.get_api().get_resource("/system/identity")
+
+        with patch.object(client, "_create_connection", return_value=mock_mikrotik_connection):
+            client.get_identity()
+            client.get_identity()
+            assert identity_resource.call.call_count == 1
+
+            client.reboot()
+            client.get_identity()
+            assert identity_resource.call.call_count == 2
+
     def test_get_identity_unknown(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
         """Should return 'Unknown' when identity not found."""
         client = MikroTikClient(sample_mikrotik_device)
@@ -103,6 +284,9 @@ class TestMikroTikClient:
 
         assert len(logs) == 2
         assert logs[0]["message"] == "Test log 1"
+        mock_mikrotik_connection.get_api().get_resource("/log").call.assert_called_once_with(
+            "print", {".proplist": "time,topics,message"}, {}
+        )
 
     def test_get_logs_empty(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
         """Should return empty list when no logs."""
@@ -133,6 +317,9 @@ class TestMikroTikClient:
 
         assert len(services) == 2
         assert services[0]["name"] == "ssh"
+        mock_mikrotik_connection.get_api().get_resource("/ip/service").call.assert_called_once_with(
+            "print", {".proplist": "name,port,proto,address,certificate"}, {"disabled": "no", "dynamic": "no"}
+        )
 
     def test_check_for_updates(self, sample_mikrotik_device, mock_mikrotik_connection, mock_ssl_context):
         """Should check for updates and return result."""
@@ -176,6 +363,11 @@ class TestGetClient:
         assert client is not None
         assert client.device.slug == "test_router"
 
+    def test_get_client_is_cached(self, sample_config, mock_ssl_context):
+        """Should return the same client for repeated lookups."""
+        with patch("app.mikrotik.client.get_config", return_value=sample_config):
+            assert get_client("test_router") is get_client("test_router")
+
     def test_get_client_not_found(self, sample_config):
         """Should return None for non-existent device."""
         with patch("app.mikrotik.client.get_config", return_value=sample_config):
@@ -194,3 +386,22 @@ class TestGetAllClients:
 
         assert len(clients) == 1
         assert clients[0].device.slug == "test_router"
+
+
+class TestRunOnAll:
+    """Tests for run_on_all function."""
+
+    async def test_collects_results_and_errors(self):
+        """Should return one result per client, with failures as exceptions."""
+        clients = [MagicMock(), MagicMock()]
+        error = ConnectionError("unreachable")
+
+        def method(client):
+            if client is clients[1]:
+                raise error
+            return "ok"
+
+        with patch("app.mikrotik.client.get_all_clients", return_value=clients):
+            results = await run_on_all(method)
+
+        assert results == ["ok", error]
@@ -0,0 +1,120 @@
+"""Tests for app.mikrotik._internal.command_base module."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from telegram.ext import CallbackQueryHandler, CommandHandler
+
+from app.mikrotik._internal import command_base
+from app.mikrotik._internal.command_base import (
+    CALLBACK_PATTERN,
+    SensitiveCommand,
+    SimpleCommand,
+    dispatch_callback,
+)
+
+
+@pytest.fixture(autouse=True)
+def isolated_routes():
+    """Run each test against an empty callback route table."""
+    with patch.dict(command_base._CALLBACK_ROUTES, clear=True):
+        yield
+
+
+class TestCallbackPattern:
+    """Tests for CALLBACK_PATTERN."""
+
+    def test_extracts_action_and_slug(self):
+        match = CALLBACK_PATTERN.match("mt:reboot_yes:main_router")
+        assert match.groups() == ("reboot_yes", "main_router")
+
+    def test_rejects_other_prefixes(self):
+        assert CALLBACK_PATTERN.match("other:status:main_router") is None
+
+
+class TestResolveClient:
+    """Tests for _resolve_client."""
+
+    async def test_returns_client(self):
+        query = MagicMock(data="mt:status:test_router")
+        client = MagicMock()
+        with patch.object(command_base, "get_client", return_value=client) as get_client:
+            assert await command_base._resolve_client(query) is client
+        get_client.assert_called_once_with("test_router")
+
+    async def test_unknown_device_replies(self):
+        query = MagicMock(data="mt:status:missing")
+        query.edit_message_text = AsyncMock()
+        with patch.object(command_base, "get_client", return_value=None):
+            assert await command_base._resolve_client(query) is None
+        query.edit_message_text.assert_awaited_once_with("Device not found: missing")
+
+    @pytest.mark.parametrize("data", ["mt:status", "mt:status:", "mt::slug", "mt:a:b:c", "mt", "xx:status:slug"])
+    async def test_malformed_data(self, data):
+        query = MagicMock(data=data)
+        with patch.object(command_base, "get_client") as get_client:
+            assert await command_base._resolve_client(query) is None
+        get_client.assert_not_called()
+
+
+class TestResolution:
+    """Tests for resolving client methods and formatters at construction."""
+
+    def test_resolves_functions(self):
+        cmd = SimpleCommand("status", "System status", "get_system_resource", "format_status_message")
+        assert cmd._client_method_fn is command_base.MikroTikClient.get_system_resource
+        assert cmd._formatter_fn is command_base.formatters.format_status_message
+
+    def test_unknown_formatter_fails_fast(self):
+        with pytest.raises(AttributeError):
+            SimpleCommand("status", "System status", "get_system_resource", "format_missing")
+
+
+class TestRegister:
+    """Tests for command registration."""
+
+    def test_simple_command_adds_route_not_handler(self):
+        app = MagicMock()
+        cmd = SimpleCommand("status", "System status", "get_system_resource", "format_status_message")
+        cmd.register(app)
+
+        assert app.add_handler.call_count == 1
+        assert isinstance(app.add_handler.call_args.args[0], CommandHandler)
+        assert set(command_base._CALLBACK_ROUTES) == {"status"}
+        assert command_base._CALLBACK_ROUTES["status"].__wrapped__ == cmd._on_device_selected
+
+    def test_sensitive_command_routes(self):
+        app = MagicMock()
+        SensitiveCommand(
+            "reboot", "Reboot", "reboot", "format_reboot_confirmation_message", "done"
+        ).register(app)
+
+        assert set(command_base._CALLBACK_ROUTES) == {"reboot_confirm", "reboot_yes", "reboot_no"}
+
+    def test_dispatcher_is_single_callback_handler(self):
+        app = MagicMock()
+        command_base.register_callback_dispatcher(app)
+
+        handler = app.add_handler.call_args.args[0]
+        assert isinstance(handler, CallbackQueryHandler)
+        assert handler.pattern is CALLBACK_PATTERN
+
+
+class TestDispatchCallback:
+    """Tests for dispatch_callback."""
+
+    async def test_routes_by_action(self, mock_update_callback, mock_context):
+        route = AsyncMock()
+        command_base._CALLBACK_ROUTES["status"] = route
+        mock_context.match = CALLBACK_PATTERN.match("mt:status:test_router")
+
+        await dispatch_callback(mock_update_callback, mock_context)
+
+        route.assert_awaited_once_with(mock_update_callback, mock_context)
+
+    async def test_unknown_action_is_ignored(self, mock_update_callback, mock_context):
+        mock_context.match = CALLBACK_PATTERN.match("mt:unknown:test_router")
+
+        await dispatch_callback(mock_update_callback, mock_context)
+
+        mock_update_callback.callback_query.answer.assert_not_called()
@@ -39,6 +39,13 @@ class TestFormatStatusMessage:
         assert "Memory" in message
         assert "Disk" in message
 
+    def test_handles_missing_numeric_fields(self):
+        """Should treat missing or empty numeric fields as defaults."""
+        message = format_status_message("TestRouter", {"free-memory": "", "cpu-load": "1"})
+
+        assert "TestRouter" in message
+        assert "*Memory:* 100.0% used" in message
+
 
 class TestFormatInterfacesMessage:
     """Tests for format_interfaces_message."""
@@ -169,6 +176,14 @@ class TestUpdateMessages:
         assert "available" in message.lower()
         assert "/upgrade" in message.lower()
 
+    def test_format_updates_empty_latest_version(self):
+        """Should not report an update while the latest version is unknown."""
+        update_info = {"installed-version": "7.10", "latest-version": "", "channel": "stable"}
+
+        message = format_updates_message("TestRouter", update_info)
+
+        assert "latest version" in message.lower()
+
     def test_format_update_current_deprecated(self):
         """Should still work with deprecated function."""
         update_info = {
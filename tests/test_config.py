@@ -11,6 +11,7 @@ from app.config import (
     Config,
     MikroTikDevice,
     _slugify,
+    _list_certs,
     _get_env,
     load_config,
     get_config,
@@ -39,6 +40,18 @@ class TestSlugify:
         assert _slugify("") == ""
 
 
+class TestListCerts:
+    """Tests for _list_certs function."""
+
+    def test_lists_files_only(self, tmp_path):
+        (tmp_path / "router.crt").write_text("cert")
+        (tmp_path / "subdir").mkdir()
+        assert _list_certs(tmp_path) == {"router.crt"}
+
+    def test_missing_directory(self, tmp_path):
+        assert _list_certs(tmp_path / "missing") == frozenset()
+
+
 class TestGetEnv:
     """Tests for _get_env function."""
 
@@ -90,6 +103,10 @@ class TestConfig:
         device = sample_config.get_mikrotik_device("nonexistent")
         assert device is None
 
+    def test_admin_contains(self, sample_config):
+        assert sample_config.admin_contains(123456789)
+        assert not sample_config.admin_contains(111)
+
     def test_config_is_frozen(self, sample_config):
         with pytest.raises(AttributeError):
             sample_config.telegram_token = "new-token"
@@ -133,16 +150,13 @@ class TestGetConfig:
     """Tests for get_config singleton function."""
 
     def test_get_config_returns_same_instance(self, sample_config):
-        # Reset the singleton
-        import app.config as config_module
-        original = config_module._config
-
+        get_config.cache_clear()
         try:
-            config_module._config = sample_config
-
-            config1 = get_config()
-            config2 = get_config()
+            with patch("app.config.load_config", return_value=sample_config) as mock_load:
+                config1 = get_config()
+                config2 = get_config()
 
             assert config1 is config2
+            mock_load.assert_called_once()
         finally:
-            config_module._config = original
+            get_config.cache_clear()